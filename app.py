@@ -1,4 +1,4 @@
-from flask import Flask, render_template, jsonify, request, send_from_directory
+from flask import Flask, render_template, jsonify, request, send_from_directory, Response, stream_with_context, g
 import sqlite3
 import os
 import time
@@ -8,9 +8,27 @@ from datetime import datetime, timedelta
 import musicbrainzngs
 import requests
 import json
+import re
+import unicodedata
+import csv
+import io
 import urllib.parse
+import base64
 import subprocess
+import shlex
+import queue
+import random
+import atexit
+import cProfile
+import pstats
+import hmac
+import hashlib
+from collections import deque, OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
 
 app = Flask(__name__)
 
@@ -18,17 +36,310 @@ app = Flask(__name__)
 BEETS_CONFIG_PATH = '/config/config.yaml'
 BEETS_DB_PATH = '/config/library.db'
 MUSIC_PATH = '/music/'
+SEARCH_INDEX_PATH = '/config/library_search.db'
+MUSICBRAINZ_CACHE_PATH = '/config/musicbrainz_cache.db'
 
 # slskd configuration
 SLSKD_CONFIG = {
     'enabled': os.getenv('SLSKD_ENABLED', 'false').lower() == 'true',
     'url': os.getenv('SLSKD_URL', 'http://192.168.1.65:5030'),
     'api_key': os.getenv('SLSKD_API_KEY', ''),
-    'download_dir': os.getenv('SLSKD_DOWNLOAD_DIR', '/downloads')
+    'download_dir': os.getenv('SLSKD_DOWNLOAD_DIR', '/downloads'),
+    'poll_interval': float(os.getenv('SLSKD_POLL_INTERVAL', '1.0')),  # Seconds between search polls
+    'score_threshold': int(os.getenv('SLSKD_SCORE_THRESHOLD', '100')),  # Stop searching once a candidate scores this
+    'verbose_scoring': os.getenv('SLSKD_VERBOSE_SCORING', 'false').lower() == 'true',  # Log every candidate's score breakdown
+    'search_cache_ttl': int(os.getenv('SLSKD_SEARCH_CACHE_TTL', '300')),  # Seconds search results are reused, 0 disables
+    'search_cache_partial_ttl': int(os.getenv('SLSKD_SEARCH_CACHE_PARTIAL_TTL', '120')),  # Same, for searches stopped early
+    'search_cache_size': int(os.getenv('SLSKD_SEARCH_CACHE_SIZE', '64'))  # Queries kept before LRU eviction
+}
+
+# Download worker pool configuration
+DOWNLOAD_CONFIG = {
+    'workers': int(os.getenv('DOWNLOAD_WORKERS', '2')),  # Concurrent search/download pipelines
+    'queue_size': int(os.getenv('DOWNLOAD_QUEUE_SIZE', '50'))  # Jobs waiting beyond that are rejected
+}
+
+# Release-date scheduler: queues downloads once wishlist albums are released
+SCHEDULER_CONFIG = {
+    'enabled': os.getenv('SCHEDULER_ENABLED', 'true').lower() == 'true',
+    'interval': int(os.getenv('SCHEDULER_INTERVAL', '15')),  # Minutes between checks
+    'batch_size': int(os.getenv('SCHEDULER_BATCH_SIZE', '5')),  # Albums queued per check at most
+    'max_active': int(os.getenv('SCHEDULER_MAX_ACTIVE', os.getenv('DOWNLOAD_WORKERS', '2'))),  # Queued + running jobs cap
+    'max_attempts': int(os.getenv('SCHEDULER_MAX_ATTEMPTS', '5')),
+    'retry_backoff': int(os.getenv('SCHEDULER_RETRY_BACKOFF', '3600'))  # Seconds before the first retry, doubled each time
+}
+
+# Download progress tracker: follows slskd transfers of running download jobs
+TRACKER_CONFIG = {
+    'enabled': os.getenv('TRACKER_ENABLED', 'true').lower() == 'true',
+    'interval': float(os.getenv('TRACKER_INTERVAL', '30')),  # Seconds between slskd transfer polls
+    'stall_timeout': int(os.getenv('TRACKER_STALL_TIMEOUT', '1800')),  # Seconds without progress before failing a job
+    'max_fallbacks': int(os.getenv('TRACKER_MAX_FALLBACKS', '2'))  # Retries with the next-best peer per album
+}
+
+# Auto-import of finished downloads into beets
+IMPORT_CONFIG = {
+    'enabled': os.getenv('IMPORT_ENABLED', 'true').lower() == 'true',
+    'command': os.getenv(
+        'BEETS_IMPORT_COMMAND',
+        f'beet -c {shlex.quote(BEETS_CONFIG_PATH)} -l {shlex.quote(BEETS_DB_PATH)} import -q'
+    ),  # Folder path is appended
+    'quiet_period': float(os.getenv('IMPORT_QUIET_PERIOD', '60')),  # Seconds without changes before importing
+    'timeout': int(os.getenv('IMPORT_TIMEOUT', '1800')),
+    'max_attempts': int(os.getenv('IMPORT_MAX_ATTEMPTS', '3')),
+    'retry_backoff': int(os.getenv('IMPORT_RETRY_BACKOFF', '600'))  # Seconds before the first retry, doubled each time
+}
+
+# Opt-in cProfile capture for requests and download jobs
+PROFILING_CONFIG = {
+    'profile_all': os.getenv('PROFILE_ALL', 'false').lower() == 'true',  # Profile every request and job
+    'admin_token': os.getenv('PROFILE_ADMIN_TOKEN', ''),  # Enables per-request profiling via X-Profile header
+    'directory': os.getenv('PROFILE_DIR', '/config/profiles'),
+    'keep': int(os.getenv('PROFILE_KEEP', '50'))  # Newest profiles kept, older ones are deleted
+}
+
+# Filesystem watcher configuration
+WATCHER_CONFIG = {
+    'enabled': os.getenv('WATCHER_ENABLED', 'true').lower() == 'true',
+    'debounce': float(os.getenv('WATCHER_DEBOUNCE', '2.0'))  # Seconds of quiet before publishing
 }
 
 # MusicBrainz setup
 musicbrainzngs.set_useragent("beets-frontend", "1.0", "https://github.com/beetbox/beets")
+# Rate limiting is done by MusicBrainzGateway so every caller shares one limiter
+musicbrainzngs.set_rate_limit(False)
+
+MUSICBRAINZ_CONFIG = {
+    'min_interval': float(os.getenv('MUSICBRAINZ_MIN_INTERVAL', '1.0')),  # Seconds between API calls
+    'cache_ttl': int(os.getenv('MUSICBRAINZ_CACHE_TTL', str(7 * 24 * 3600))),  # Release cache lifetime
+    'cache_size': int(os.getenv('MUSICBRAINZ_CACHE_SIZE', '5000')),  # Releases kept before LRU eviction
+    'search_cache_ttl': int(os.getenv('MUSICBRAINZ_SEARCH_CACHE_TTL', '600')),  # Typeahead result lifetime
+    'search_cache_size': int(os.getenv('MUSICBRAINZ_SEARCH_CACHE_SIZE', '256'))
+}
+
+class Metrics:
+    """In-process latency histograms, rendered in the Prometheus text
+    exposition format by /metrics."""
+
+    PREFIX = 'beets_frontend_'
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+    HELP = {
+        'http_request_duration_seconds': 'Flask request latency by route, method and status',
+        'dependency_duration_seconds': 'Latency of slskd, MusicBrainz and beets calls',
+        'dependency_errors_total': 'Failed slskd, MusicBrainz and beets calls'
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted(labels.items()))
+
+    def observe(self, name, value, **labels):
+        key = (name, self._key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(self.BUCKETS), 0.0, 0]
+            for i, bound in enumerate(self.BUCKETS):
+                if value <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, self._key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def dependency(self, dependency, operation):
+        """Time a call to an external dependency, counting failures."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc('dependency_errors_total', dependency=dependency, operation=operation)
+            raise
+        finally:
+            self.observe('dependency_duration_seconds', time.perf_counter() - start,
+                         dependency=dependency, operation=operation)
+
+    def timed(self, dependency):
+        """Decorator timing every call of a function as a dependency operation."""
+        def decorator(func):
+            def wrapper(*args, **kwargs):
+                with self.dependency(dependency, func.__name__):
+                    return func(*args, **kwargs)
+            wrapper.__name__ = func.__name__
+            wrapper.__doc__ = func.__doc__
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def _labels(labels):
+        if not labels:
+            return ''
+        escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in labels)
+        return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + '}'
+
+    def render(self, gauges=()):
+        """Return the exposition text; `gauges` is a list of
+        (name, type, help, [(labels_dict, value), ...]) read at scrape time."""
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        last = None
+        for (name, labels), (buckets, total, count) in histograms:
+            full = self.PREFIX + name
+            if name != last:
+                lines += [f'# HELP {full} {self.HELP.get(name, name)}', f'# TYPE {full} histogram']
+                last = name
+            for bound, value in zip(self.BUCKETS, buckets):
+                lines.append(f'{full}_bucket{self._labels(labels + (("le", bound),))} {value}')
+            lines.append(f'{full}_bucket{self._labels(labels + (("le", "+Inf"),))} {count}')
+            lines.append(f'{full}_sum{self._labels(labels)} {total}')
+            lines.append(f'{full}_count{self._labels(labels)} {count}')
+
+        last = None
+        for (name, labels), value in counters:
+            full = self.PREFIX + name
+            if name != last:
+                lines += [f'# HELP {full} {self.HELP.get(name, name)}', f'# TYPE {full} counter']
+                last = name
+            lines.append(f'{full}{self._labels(labels)} {value}')
+
+        for name, metric_type, help_text, samples in gauges:
+            full = self.PREFIX + name
+            lines += [f'# HELP {full} {help_text}', f'# TYPE {full} {metric_type}']
+            for labels, value in samples:
+                if value is not None:
+                    lines.append(f'{full}{self._labels(self._key(labels))} {value}')
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics()
+
+class Profiler:
+    """Opt-in cProfile capture for single requests and background jobs.
+
+    Profiling is on for everything with PROFILE_ALL, or per request when an
+    `X-Profile: 1` header comes with an `X-Admin-Token` matching
+    PROFILE_ADMIN_TOKEN. Profiles are written as pstats files to a directory
+    that only keeps the newest `keep` of them.
+    """
+
+    NAME_RE = re.compile(r'[^A-Za-z0-9._-]+')
+
+    def __init__(self, directory, keep=50, profile_all=False, admin_token=''):
+        self.directory = directory
+        self.keep = keep
+        self.profile_all = profile_all
+        self.admin_token = admin_token
+        self._lock = threading.Lock()
+
+    def is_admin(self, req):
+        token = req.headers.get('X-Admin-Token', '')
+        return bool(self.admin_token) and hmac.compare_digest(token.encode(), self.admin_token.encode())
+
+    def wants(self, req):
+        """Whether a request (or the job it starts) should be profiled."""
+        return self.profile_all or (req.headers.get('X-Profile') == '1' and self.is_admin(req))
+
+    def start(self):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active on this thread
+            return None
+        return profile
+
+    def save(self, profile, kind, name, duration):
+        """Stop `profile`, write it out and return the file name."""
+        profile.disable()
+        slug = self.NAME_RE.sub('_', name).strip('_')[:80] or 'root'
+        filename = f"{int(time.time() * 1000)}-{kind}-{slug}-{int(duration * 1000)}ms.prof"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            profile.dump_stats(os.path.join(self.directory, filename))
+            self._rotate()
+        except OSError as e:
+            print(f"Could not write profile {filename}: {e}")
+            return None
+        return filename
+
+    @contextmanager
+    def profile(self, kind, name, enabled=True):
+        """Profile the body of a with-block when `enabled`."""
+        profile = self.start() if enabled else None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if profile:
+                filename = self.save(profile, kind, name, time.perf_counter() - start)
+                if filename:
+                    print(f"Saved profile {filename}")
+
+    def files(self):
+        try:
+            return sorted((f for f in os.listdir(self.directory) if f.endswith('.prof')), reverse=True)
+        except OSError:
+            return []
+
+    def _rotate(self):
+        with self._lock:
+            for old in self.files()[self.keep:]:
+                try:
+                    os.remove(os.path.join(self.directory, old))
+                except OSError:
+                    pass
+
+    def list(self, limit=50):
+        """Recent profiles, newest first."""
+        profiles = []
+        for filename in self.files()[:limit]:
+            created, kind, rest = filename[:-len('.prof')].split('-', 2)
+            name, _, duration = rest.rpartition('-')
+            profiles.append({
+                'file': filename,
+                'kind': kind,
+                'name': name,
+                'duration_ms': int(duration.rstrip('ms') or 0),
+                'created': datetime.fromtimestamp(int(created) / 1000).strftime('%Y-%m-%d %H:%M:%S'),
+                'size': os.path.getsize(os.path.join(self.directory, filename))
+            })
+        return profiles
+
+    def summary(self, filename, limit=40):
+        """Text report of a profile's top functions by cumulative time."""
+        out = io.StringIO()
+        stats = pstats.Stats(os.path.join(self.directory, filename), stream=out)
+        stats.sort_stats('cumulative').print_stats(limit)
+        return out.getvalue()
+
+profiler = Profiler(
+    PROFILING_CONFIG['directory'],
+    keep=PROFILING_CONFIG['keep'],
+    profile_all=PROFILING_CONFIG['profile_all'],
+    admin_token=PROFILING_CONFIG['admin_token']
+)
+
+def sqlite_file_token(path):
+    """Return (mtime, size) pairs for an SQLite file and its WAL."""
+    token = []
+    for p in (path, path + '-wal'):
+        try:
+            st = os.stat(p)
+            token.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            token.append(None)
+    return tuple(token)
 
 class BeetsInterface:
     def __init__(self):
@@ -80,15 +391,832 @@ class BeetsInterface:
             traceback.print_exc()
             self.lib = None
 
+    @metrics.timed('beets')
+    def album_page(self, search, page, per_page):
+        """Fetch one page of albums with LIMIT/OFFSET and a separate COUNT.
+
+        Only the rows on the requested page are turned into Album objects.
+        Returns (albums, total, album_dirs) or None when the search needs a
+        slow (Python-side) query or sort, in which case the caller should
+        fall back to materializing the full result set.
+        """
+        from beets.library import Album, parse_query_string
+        from beets.dbcore.query import NullSort
+
+        if search:
+            query, sort = parse_query_string(search, Album)
+        else:
+            query, sort = None, None
+
+        if not sort or isinstance(sort, NullSort):
+            sort = self.lib.get_default_album_sort()
+
+        if query is not None:
+            where, subvals = query.clause()
+            if not where:
+                return None
+        else:
+            where, subvals = '1', ()
+
+        if sort.is_slow():
+            return None
+
+        order_by = sort.order_clause()
+        order_sql = f"ORDER BY {order_by}, id" if order_by else "ORDER BY id"
+        offset = max(page - 1, 0) * per_page
+
+        with self.lib.transaction() as tx:
+            total = tx.query(f"SELECT COUNT(*) FROM albums WHERE {where}", subvals)[0][0]
+            rows = tx.query(
+                f"SELECT * FROM albums WHERE {where} {order_sql} LIMIT ? OFFSET ?",
+                tuple(subvals) + (per_page, offset)
+            )
+            albums, album_dirs = self._materialize_albums(tx, rows)
+
+        return albums, total, album_dirs
+
+    @metrics.timed('beets')
+    def albums_by_ids(self, album_ids):
+        """Fetch albums by id, preserving the order of `album_ids`.
+
+        Returns (albums, album_dirs); ids that no longer exist are skipped.
+        """
+        if not album_ids:
+            return [], {}
+
+        placeholders = ','.join('?' * len(album_ids))
+        with self.lib.transaction() as tx:
+            rows = tx.query(f"SELECT * FROM albums WHERE id IN ({placeholders})", album_ids)
+            position = {album_id: i for i, album_id in enumerate(album_ids)}
+            rows = sorted(rows, key=lambda row: position[row['id']])
+            return self._materialize_albums(tx, rows)
+
+    def _materialize_albums(self, tx, rows):
+        """Build Album objects for `rows` and resolve their directories."""
+        from beets.library import Album
+        from beets.dbcore.db import Results
+
+        album_ids = [row['id'] for row in rows]
+        flex_rows = []
+        album_dirs = {}
+        if album_ids:
+            placeholders = ','.join('?' * len(album_ids))
+            flex_rows = tx.query(
+                f"SELECT * FROM album_attributes WHERE entity_id IN ({placeholders})",
+                album_ids
+            )
+            # Album.path does one items query per album; resolve them all at once
+            for album_id, path in tx.query(
+                f"SELECT album_id, MIN(path) FROM items WHERE album_id IN ({placeholders}) GROUP BY album_id",
+                album_ids
+            ):
+                album_dirs[album_id] = os.path.dirname(path)
+
+        albums = list(Results(Album, rows, self.lib, flex_rows))
+        return albums, album_dirs
+
+    @metrics.timed('beets')
+    def recent_albums(self, since, limit=20):
+        """Return the most recently added albums with their track counts.
+
+        Ordering, limiting and track counting all happen in one SQL statement
+        instead of one items query per album.
+        """
+        with self.lib.transaction() as tx:
+            return tx.query('''
+                SELECT recent.album, recent.albumartist, recent.year, recent.added,
+                       COUNT(items.id) AS tracks
+                FROM (
+                    SELECT id, album, albumartist, year, added
+                    FROM albums
+                    WHERE added >= ?
+                    ORDER BY added DESC
+                    LIMIT ?
+                ) AS recent
+                LEFT JOIN items ON items.album_id = recent.id
+                GROUP BY recent.id
+                ORDER BY recent.added DESC
+            ''', (since, limit))
+
+    def change_token(self):
+        """Return a value that changes whenever the library database changes.
+
+        Combines beets' in-process revision counter with the size and mtime of
+        the database file and its WAL, so writes from `beet` itself are seen too.
+        """
+        if not self.lib:
+            return None
+        return (self.lib.revision,) + sqlite_file_token(self.lib.path)
+
+class LibraryStatsCache:
+    """Library statistics computed with SQL aggregates and cached until the
+    library database changes."""
+
+    def __init__(self, interface):
+        self.interface = interface
+        self._lock = threading.Lock()
+        self._token = None
+        self._stats = None
+        self.counters = {'hits': 0, 'misses': 0}
+
+    def get(self):
+        """Return cached stats, recomputing only if the library changed."""
+        token = self.interface.change_token()
+        with self._lock:
+            if self._stats is not None and self._token == token:
+                self.counters['hits'] += 1
+                return self._stats
+            self.counters['misses'] += 1
+
+        stats = self.compute()
+
+        with self._lock:
+            self._token = token
+            self._stats = stats
+        return stats
+
+    def invalidate(self):
+        """Drop the cached stats so the next call recomputes them."""
+        with self._lock:
+            self._token = None
+            self._stats = None
+
+    @metrics.timed('beets')
+    def compute(self):
+        """Compute album/track counts, total duration and format breakdown."""
+        with self.interface.lib.transaction() as tx:
+            album_count = tx.query('SELECT COUNT(*) FROM albums')[0][0]
+            track_count, total_duration = tx.query(
+                'SELECT COUNT(*), COALESCE(SUM(length), 0) FROM items'
+            )[0]
+            format_rows = tx.query('SELECT format, COUNT(*) FROM items GROUP BY format')
+
+        formats = {}
+        for fmt, count in format_rows:
+            fmt = fmt or 'Unknown'
+            formats[fmt] = formats.get(fmt, 0) + count
+
+        return {
+            'albums': album_count,
+            'tracks': track_count,
+            'duration': total_duration,
+            'formats': formats
+        }
+
+class LibraryEvents:
+    """In-process publish/subscribe hub for library change events.
+
+    Event kinds used by the app:
+      'library_db' - the beets library database was written
+      'music_dir'  - files under MUSIC_PATH were added, removed or moved
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listeners = {}
+
+    def subscribe(self, kind, callback):
+        """Call `callback(kind, paths)` whenever an event of `kind` is published."""
+        with self._lock:
+            self._listeners.setdefault(kind, []).append(callback)
+
+    def publish(self, kind, paths=()):
+        """Deliver an event to every listener subscribed to `kind`."""
+        with self._lock:
+            listeners = list(self._listeners.get(kind, []))
+        for callback in listeners:
+            try:
+                callback(kind, paths)
+            except Exception as e:
+                print(f"Error in {kind} listener {callback}: {e}")
+
+class LibraryWatcher(FileSystemEventHandler):
+    """Watch the beets database and music directory and publish debounced
+    change events on a LibraryEvents hub."""
+
+    def __init__(self, events, db_path, music_path, ignore_paths=(), debounce=2.0):
+        super().__init__()
+        self.events = events
+        self.db_path = os.path.abspath(db_path)
+        self.music_path = os.path.abspath(music_path)
+        self.ignore_paths = [os.path.abspath(p) for p in ignore_paths if p]
+        self.debounce = debounce
+        self.observer = None
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._timer = None
+
+    def start(self):
+        """Start the watchdog observer in the background."""
+        self.observer = Observer()
+        self.observer.daemon = True
+
+        db_dir = os.path.dirname(self.db_path)
+        if os.path.isdir(db_dir):
+            self.observer.schedule(self, db_dir, recursive=False)
+            print(f"✓ Watching beets database: {self.db_path}")
+
+        if os.path.isdir(self.music_path) and self.music_path != db_dir:
+            try:
+                self.observer.schedule(self, self.music_path, recursive=True)
+                print(f"✓ Watching music directory: {self.music_path}")
+            except OSError as e:
+                # Typically the inotify watch limit on very large libraries
+                print(f"⚠ Could not watch music directory {self.music_path}: {e}")
+
+        self.observer.start()
+
+    def stop(self):
+        """Stop the observer and flush any pending events."""
+        if self.observer:
+            self.observer.stop()
+            self.observer.join(timeout=5)
+        self.flush()
+
+    def classify(self, path):
+        """Map a filesystem path to an event kind, or None to ignore it."""
+        path = os.path.abspath(path)
+        for ignored in self.ignore_paths:
+            if path == ignored or path.startswith(ignored + '-'):
+                return None
+        if path in (self.db_path, self.db_path + '-wal', self.db_path + '-journal'):
+            return 'library_db'
+        if path.startswith(self.music_path.rstrip(os.sep) + os.sep):
+            return 'music_dir'
+        return None
+
+    def on_any_event(self, event):
+        if event.event_type in ('opened', 'closed_no_write'):
+            return
+        if event.event_type == 'modified' and event.is_directory:
+            return
+
+        paths = [event.src_path]
+        if getattr(event, 'dest_path', None):
+            paths.append(event.dest_path)
+
+        with self._lock:
+            for path in paths:
+                kind = self.classify(path)
+                if kind:
+                    self._pending.setdefault(kind, set()).add(path)
+
+            if not self._pending:
+                return
+
+            # Restart the quiet period on every event
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Publish everything collected since the last flush."""
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+
+        for kind, paths in pending.items():
+            self.events.publish(kind, sorted(paths))
+
+class LibrarySearchIndex:
+    """Sidecar SQLite FTS5 index over album artist, album title, track
+    titles and year, kept in sync with the beets database incrementally."""
+
+    # bm25 column weights: albumartist, album, tracks, year
+    RANK_WEIGHTS = (10.0, 8.0, 1.0, 2.0)
+    SYNC_CHUNK = 500
+
+    def __init__(self, index_path, library_path):
+        self.index_path = index_path
+        self.library_path = library_path
+        self.ready = False
+        self.synced_token = None
+        self._conn = None
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._dirty = False
+        self._syncing = False
+
+    def open(self):
+        """Open (and create if needed) the sidecar index database."""
+        conn = sqlite3.connect(self.index_path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS album_fts USING fts5(
+                albumartist, album, tracks, year,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            );
+            CREATE TABLE IF NOT EXISTS album_signature (
+                album_id INTEGER PRIMARY KEY,
+                signature TEXT NOT NULL
+            );
+        ''')
+        conn.commit()
+        self._conn = conn
+
+    def request_sync(self):
+        """Schedule a background sync; coalesces requests made while one runs."""
+        with self._state_lock:
+            self._dirty = True
+            if self._syncing:
+                return
+            self._syncing = True
+        threading.Thread(target=self._sync_loop, daemon=True).start()
+
+    def _sync_loop(self):
+        while True:
+            with self._state_lock:
+                if not self._dirty:
+                    self._syncing = False
+                    return
+                self._dirty = False
+            try:
+                self.sync()
+            except Exception as e:
+                print(f"Error syncing library search index: {e}")
+
+    def is_stale(self):
+        """Whether the beets database changed since the last sync."""
+        return sqlite_file_token(self.library_path) != self.synced_token
+
+    def sync(self):
+        """Bring the index up to date with the beets database.
+
+        Each album gets a signature hashed from exactly the fields that are
+        indexed, so any edit to them (with or without an mtime bump) is
+        seen; only albums whose signature changed are re-read and re-indexed.
+        """
+        if self._conn is None:
+            self.open()
+
+        start = time.time()
+        token = sqlite_file_token(self.library_path)
+        library = sqlite3.connect(f'file:{self.library_path}?mode=ro', uri=True)
+        try:
+            current = {}
+            for album_id, albumartist, album, year, count, titles in library.execute('''
+                SELECT albums.id, albums.albumartist, albums.album, albums.year,
+                       COUNT(items.id), GROUP_CONCAT(items.title, char(31))
+                FROM albums
+                LEFT JOIN items ON items.album_id = albums.id
+                GROUP BY albums.id
+            '''):
+                # GROUP_CONCAT order is unspecified, so sort before hashing
+                titles = sorted((titles or '').split('\x1f'))
+                current[album_id] = hashlib.blake2b(
+                    repr((albumartist, album, year, count, titles)).encode(), digest_size=16
+                ).hexdigest()
+
+            with self._lock:
+                stored = dict(self._conn.execute('SELECT album_id, signature FROM album_signature'))
+
+            removed = [album_id for album_id in stored if album_id not in current]
+            changed = [album_id for album_id, sig in current.items() if stored.get(album_id) != sig]
+
+            for i in range(0, len(changed), self.SYNC_CHUNK):
+                chunk = changed[i:i + self.SYNC_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+
+                docs = {}
+                for album_id, albumartist, album, year in library.execute(
+                    f"SELECT id, albumartist, album, year FROM albums WHERE id IN ({placeholders})", chunk
+                ):
+                    docs[album_id] = [albumartist or '', album or '', [], str(year) if year else '']
+                for album_id, title in library.execute(
+                    f"SELECT album_id, title FROM items WHERE album_id IN ({placeholders})", chunk
+                ):
+                    if album_id in docs and title:
+                        docs[album_id][2].append(title)
+
+                with self._lock:
+                    self._conn.executemany('DELETE FROM album_fts WHERE rowid = ?', [(a,) for a in chunk])
+                    self._conn.executemany(
+                        'INSERT INTO album_fts (rowid, albumartist, album, tracks, year) VALUES (?, ?, ?, ?, ?)',
+                        [(a, d[0], d[1], ' '.join(d[2]), d[3]) for a, d in docs.items()]
+                    )
+                    self._conn.executemany(
+                        'INSERT OR REPLACE INTO album_signature (album_id, signature) VALUES (?, ?)',
+                        [(a, current[a]) for a in chunk]
+                    )
+                    self._conn.commit()
+
+            if removed:
+                with self._lock:
+                    self._conn.executemany('DELETE FROM album_fts WHERE rowid = ?', [(a,) for a in removed])
+                    self._conn.executemany('DELETE FROM album_signature WHERE album_id = ?', [(a,) for a in removed])
+                    self._conn.commit()
+        finally:
+            library.close()
+
+        self.ready = True
+        self.synced_token = token
+        if changed or removed:
+            print(f"✓ Search index synced: {len(changed)} updated, {len(removed)} removed "
+                  f"in {time.time() - start:.2f}s")
+
+    # A word that beets would also read as a plain substring match: no field
+    # (":"), quotes, "-"/"^" negation prefix or "+"/"-" sort suffix
+    PLAIN_TOKEN_RE = re.compile(r'\w(?:[^\s:"\']*[^\s:"\'+-])?')
+
+    @classmethod
+    def handles(cls, text):
+        """Whether `text` is plain words the index can answer like beets would."""
+        tokens = text.split()
+        return bool(tokens) and all(cls.PLAIN_TOKEN_RE.fullmatch(token) for token in tokens)
+
+    @staticmethod
+    def build_match(text):
+        """Turn free text into an FTS5 query: every token must match as a prefix."""
+        tokens = re.findall(r'\w+', text.lower())
+        if not tokens:
+            return None
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    @metrics.timed('search_index')
+    def search(self, text, limit=50, offset=0):
+        """Return (album_ids, total) for `text`, best matches first.
+
+        Returns None when the index cannot answer the query.
+        """
+        match = self.build_match(text)
+        if not self.ready or match is None:
+            return None
+
+        weights = ', '.join(str(w) for w in self.RANK_WEIGHTS)
+        with self._lock:
+            total = self._conn.execute(
+                'SELECT COUNT(*) FROM album_fts WHERE album_fts MATCH ?', (match,)
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                f'''SELECT rowid FROM album_fts WHERE album_fts MATCH ?
+                    ORDER BY bm25(album_fts, {weights}) LIMIT ? OFFSET ?''',
+                (match, limit, offset)
+            ).fetchall()
+        return [row[0] for row in rows], total
+
+class RequestSuperseded(Exception):
+    """Raised when a queued request was dropped because a newer one replaced it."""
+
+class MusicBrainzGateway:
+    """Single rate-limited entry point for MusicBrainz calls, with an
+    on-disk release cache (TTL plus LRU eviction)."""
+
+    def __init__(self, cache_path, min_interval=1.0, ttl=7 * 24 * 3600, max_entries=5000):
+        self.cache_path = cache_path
+        self.min_interval = min_interval
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._rate_lock = threading.Lock()
+        self._next_call = 0.0
+        self._stats_lock = threading.Lock()
+        self._initialized = False
+        self.counters = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'api_calls': 0, 'api_errors': 0}
+
+    def _connect(self):
+        conn = sqlite3.connect(self.cache_path, timeout=10)
+        if not self._initialized:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS release_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    fetched REAL NOT NULL,
+                    accessed REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS release_cache_accessed ON release_cache (accessed);
+            ''')
+            self._initialized = True
+        return conn
+
+    def _count(self, counter, amount=1):
+        with self._stats_lock:
+            self.counters[counter] += amount
+
+    def call(self, func, *args, should_cancel=None, **kwargs):
+        """Call a musicbrainzngs function, waiting for our turn under the rate limit.
+
+        If `should_cancel` returns True once it is our turn, the call is
+        dropped with RequestSuperseded and the slot goes to the next caller.
+        """
+        with self._rate_lock:
+            if should_cancel and should_cancel():
+                raise RequestSuperseded()
+            wait = self._next_call - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+                if should_cancel and should_cancel():
+                    raise RequestSuperseded()
+            self._next_call = time.monotonic() + self.min_interval
+        self._count('api_calls')
+        try:
+            with metrics.dependency('musicbrainz', func.__name__):
+                return func(*args, **kwargs)
+        except Exception:
+            self._count('api_errors')
+            raise
+
+    def get_release(self, mb_id, includes=()):
+        """Return `get_release_by_id` output, from the cache when fresh."""
+        cache_key = f"{mb_id}|{','.join(sorted(includes))}"
+        now = time.time()
+
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    'SELECT data, fetched FROM release_cache WHERE cache_key = ?', (cache_key,)
+                ).fetchone()
+                if row and now - row[1] < self.ttl:
+                    conn.execute('UPDATE release_cache SET accessed = ? WHERE cache_key = ?', (now, cache_key))
+                    conn.commit()
+                    self._count('hits')
+                    return json.loads(row[0])
+            finally:
+                conn.close()
+            self._count('expired' if row else 'misses')
+        except sqlite3.Error as e:
+            print(f"MusicBrainz cache read failed: {e}")
+            self._count('misses')
+
+        release_info = self.call(musicbrainzngs.get_release_by_id, mb_id, includes=list(includes))
+
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    'INSERT OR REPLACE INTO release_cache (cache_key, data, fetched, accessed) VALUES (?, ?, ?, ?)',
+                    (cache_key, json.dumps(release_info), now, now)
+                )
+                # Evict least recently used entries beyond the size limit
+                evicted = conn.execute('''
+                    DELETE FROM release_cache WHERE cache_key IN (
+                        SELECT cache_key FROM release_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?
+                    )
+                ''', (self.max_entries,)).rowcount
+                conn.commit()
+            finally:
+                conn.close()
+            if evicted > 0:
+                self._count('evictions', evicted)
+        except sqlite3.Error as e:
+            print(f"MusicBrainz cache write failed: {e}")
+
+        return release_info
+
+    def lookup_releases(self, mb_ids, batch_size=50):
+        """Resolve many release ids with as few API calls as possible.
+
+        Ids are looked up in batches with a single `reid:` search each; any
+        id the search index does not return falls back to a (cached)
+        get_release. Returns {mb_id: release} for the ids that were found.
+        """
+        releases = {}
+        for i in range(0, len(mb_ids), batch_size):
+            batch = mb_ids[i:i + batch_size]
+            query = ' OR '.join(f'reid:{mb_id}' for mb_id in batch)
+            try:
+                result = self.search_releases(query=query, limit=len(batch))
+                for release in result.get('release-list', []):
+                    if release.get('id') in batch:
+                        releases[release['id']] = release
+            except Exception as e:
+                print(f"Batched MusicBrainz lookup failed: {e}")
+
+        for mb_id in mb_ids:
+            if mb_id in releases:
+                continue
+            try:
+                releases[mb_id] = self.get_release(mb_id, includes=['recordings'])['release']
+            except Exception as e:
+                print(f"Could not look up release {mb_id}: {e}")
+        return releases
+
+    def search_releases(self, should_cancel=None, **kwargs):
+        """Rate-limited `search_releases`."""
+        return self.call(musicbrainzngs.search_releases, should_cancel=should_cancel, **kwargs)
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self.counters)
+        lookups = stats['hits'] + stats['misses'] + stats['expired']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else None
+        try:
+            conn = self._connect()
+            try:
+                stats['entries'] = conn.execute('SELECT COUNT(*) FROM release_cache').fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            stats['entries'] = None
+        return stats
+
+class MusicBrainzSearch:
+    """Typeahead layer over MusicBrainz release search.
+
+    Identical queries in flight share one API call, recent results are
+    cached in memory, and a query still waiting for the rate limiter is
+    dropped once every client that asked for it has sent a newer query.
+    """
+
+    MAX_CLIENTS = 1024
+
+    def __init__(self, gateway, ttl=600, max_entries=256, limit=10):
+        self.gateway = gateway
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._in_flight = {}
+        self._client_seq = OrderedDict()
+        self.counters = {'hits': 0, 'misses': 0, 'coalesced': 0, 'superseded': 0}
+
+    @staticmethod
+    def normalize(query):
+        return ' '.join(query.lower().split())
+
+    def search(self, query, client_id=None):
+        """Return formatted releases for `query`; may raise RequestSuperseded."""
+        key = self.normalize(query)
+        now = time.time()
+
+        with self._lock:
+            seq = self._client_seq.get(client_id, 0) + 1
+            self._client_seq[client_id] = seq
+            self._client_seq.move_to_end(client_id)
+            while len(self._client_seq) > self.MAX_CLIENTS:
+                self._client_seq.popitem(last=False)
+            ticket = (client_id, seq)
+
+            cached = self._cache.get(key)
+            if cached and now - cached[0] < self.ttl:
+                self._cache.move_to_end(key)
+                self.counters['hits'] += 1
+                return cached[1]
+
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = {'event': threading.Event(), 'tickets': set(), 'result': None, 'error': None}
+                self._in_flight[key] = flight
+                self.counters['misses'] += 1
+            else:
+                self.counters['coalesced'] += 1
+            flight['tickets'].add(ticket)
+
+        if not leader:
+            flight['event'].wait()
+            if flight['error']:
+                raise flight['error']
+            return flight['result']
+
+        try:
+            result = self.gateway.search_releases(
+                query=query,
+                limit=self.limit,
+                type='album',
+                should_cancel=lambda: self._all_superseded(flight)
+            )
+            flight['result'] = self.format_releases(result)
+            with self._lock:
+                self._cache[key] = (time.time(), flight['result'])
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+            return flight['result']
+        except RequestSuperseded as e:
+            with self._lock:
+                self.counters['superseded'] += 1
+            flight['error'] = e
+            raise
+        except Exception as e:
+            flight['error'] = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            flight['event'].set()
+
+    def _all_superseded(self, flight):
+        with self._lock:
+            return all(self._client_seq.get(client_id, 0) > seq for client_id, seq in flight['tickets'])
+
+    @staticmethod
+    def format_releases(result):
+        releases = []
+        for release in result.get('release-list', []):
+            artist = release.get('artist-credit', [{}])[0].get('name', 'Unknown Artist')
+            
+            releases.append({
+                'id': release['id'],
+                'title': release.get('title', 'Unknown Title'),
+                'artist': artist,
+                'date': release.get('date', ''),
+                'country': release.get('country', ''),
+                'status': release.get('status', ''),
+                'score': release.get('score', 0)
+            })
+        return releases
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self._cache)
+            stats['in_flight'] = len(self._in_flight)
+        return stats
+
+class SlskdSession(requests.Session):
+    """requests session that times every slskd call for /metrics.
+
+    Calls that raise (refused connections, timeouts) and HTTP error
+    responses are both counted as dependency errors.
+    """
+
+    PATH_WORDS = {'api', 'v0', 'searches', 'responses', 'transfers', 'downloads'}
+
+    def request(self, method, url, *args, **kwargs):
+        # Label by endpoint, with search ids, usernames and transfer ids collapsed
+        path = urllib.parse.urlsplit(url).path
+        endpoint = '/'.join(part if part in self.PATH_WORDS else '{id}' for part in path.strip('/').split('/'))
+        operation = f"{method.upper()} /{endpoint}"
+        with metrics.dependency('slskd', operation):
+            response = super().request(method, url, *args, **kwargs)
+        if response.status_code >= 400:
+            metrics.inc('dependency_errors_total', dependency='slskd', operation=operation)
+        return response
+
 class SlskdClient:
-    def __init__(self, base_url, api_key=None):
+    def __init__(self, base_url, api_key=None, max_parallel_requests=8, cache_ttl=300, cache_size=64,
+                 partial_ttl=120):
         self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
+        self.max_parallel_requests = max_parallel_requests
+        # Recent search results by normalized query (TTL plus LRU eviction) so
+        # retries don't search the Soulseek network again. Searches that were
+        # stopped early are kept as partial entries with a shorter TTL.
+        self.cache_ttl = cache_ttl
+        self.partial_ttl = min(partial_ttl, cache_ttl)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_counters = {'hits': 0, 'misses': 0}
+        self.session = SlskdSession()
+        # Keep enough pooled connections for concurrent searches and page fetches
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=max_parallel_requests,
+            pool_maxsize=max_parallel_requests * 2
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         if api_key:
             self.session.headers.update({'X-API-Key': api_key})
     
-    def search(self, query, timeout=30):
-        """Search for files and return results."""
+    @staticmethod
+    def normalize_query(query):
+        return ' '.join(query.lower().split())
+    
+    def get_cached_results(self, query):
+        """Return (responses, partial) cached for `query`, or None."""
+        if not self.cache_ttl:
+            return None
+        key = self.normalize_query(query)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached and time.time() - cached[0] < (self.partial_ttl if cached[2] else self.cache_ttl):
+                self._cache.move_to_end(key)
+                self.cache_counters['hits'] += 1
+                return cached[1], cached[2]
+            if cached:
+                del self._cache[key]
+            self.cache_counters['misses'] += 1
+            return None
+    
+    def cache_results(self, query, results, partial=False):
+        # Empty results aren't cached, a retry should really search again
+        if not self.cache_ttl or not results:
+            return
+        key = self.normalize_query(query)
+        with self._cache_lock:
+            self._cache[key] = (time.time(), results, partial)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def search(self, query, timeout=30, cancel_event=None):
+        """Search for files and return results.
+
+        If `cancel_event` is set while waiting, the search is stopped on
+        slskd and an empty list is returned.
+        """
+        cached = self.get_cached_results(query)
+        if cached is not None and not cached[1]:
+            print(f"Using cached slskd results for: {query} ({len(cached[0])} responses)")
+            return cached[0]
+        
         try:
             print(f"Starting slskd search: {query}")
             
@@ -106,7 +1234,8 @@ class SlskdClient:
                 print(f"Started search with ID: {search_id}, waiting for results...")
                 
                 # Wait for results
-                results = self.wait_for_search_completion(search_id, timeout)
+                results = self.wait_for_search_completion(search_id, timeout, cancel_event)
+                self.cache_results(query, results)
                 return results
             else:
                 print(f"Failed to start search: HTTP {response.status_code} - {response.text}")
@@ -118,14 +1247,20 @@ class SlskdClient:
             traceback.print_exc()
             return []
     
-    def wait_for_search_completion(self, search_id, timeout=30):
+    def wait_for_search_completion(self, search_id, timeout=30, cancel_event=None):
         """Wait for search to complete and return results."""
         try:
             results_url = f"{self.base_url}/api/v0/searches/{search_id}"
             start_time = time.time()
             check_interval = 2  # Check every 2 seconds
+            cancel_event = cancel_event or threading.Event()
             
             while time.time() - start_time < timeout:
+                if cancel_event.is_set():
+                    print(f"Search {search_id} cancelled, stopping it on slskd")
+                    self.stop_search(search_id)
+                    return []
+                
                 elapsed = int(time.time() - start_time)
                 print(f"Checking search progress... ({elapsed}s elapsed)")
                 
@@ -141,7 +1276,7 @@ class SlskdClient:
                     
                     # If we have responses, try to fetch them
                     if response_count > 0 and elapsed >= 10:  # Wait at least 10 seconds
-                        responses = self.get_search_responses(search_id)
+                        responses = self.get_search_responses(search_id, response_count)
                         
                         if responses:
                             print(f"Successfully fetched {len(responses)} responses!")
@@ -151,15 +1286,15 @@ class SlskdClient:
                     
                     if is_complete or state in ['Completed', 'TimedOut', 'Cancelled']:
                         print(f"Search completed with state: {state}, fetching final responses...")
-                        responses = self.get_search_responses(search_id)
+                        responses = self.get_search_responses(search_id, response_count)
                         print(f"Final fetch got {len(responses)} responses")
                         return responses
                 else:
                     print(f"Failed to get search status: HTTP {response.status_code}")
                     return []
                 
-                # Wait before next check
-                time.sleep(check_interval)
+                # Wait before next check (wakes up early on cancel)
+                cancel_event.wait(check_interval)
             
             # Timeout reached, try to get whatever results we have
             print(f"Search timeout after {timeout}s, attempting final fetch...")
@@ -173,76 +1308,60 @@ class SlskdClient:
             traceback.print_exc()
             return []
 
-    def get_search_responses(self, search_id):
-        """Get responses from a search using the responses endpoint."""
+    def get_search_responses(self, search_id, response_count=None):
+        """Get responses from a search using the responses endpoint.
+
+        The first page tells us whether there is more to fetch; the total is
+        taken from `response_count` (or the search status) and the remaining
+        pages are requested concurrently, then reassembled in order.
+        """
         try:
-            all_responses = []
-            page = 0
             page_size = 50  # Fetch in chunks
+            max_pages = 21  # Safety limit
             
-            while True:
-                # Try the responses endpoint with pagination
-                responses_url = f"{self.base_url}/api/v0/searches/{search_id}/responses"
-                params = {
-                    'pageIndex': page,
-                    'pageSize': page_size
-                }
+            print(f"Fetching responses page 0 (size: {page_size})...")
+            first_page = self._get_responses_page(search_id, 0, page_size)
+            
+            if first_page is None:
+                return []
+            
+            if first_page == 'not_found':
+                print("Responses endpoint returned 404, trying alternative method...")
+                # Try without pagination
+                simple_response = self.session.get(f"{self.base_url}/api/v0/searches/{search_id}/responses")
+                if simple_response.status_code == 200:
+                    simple_data = simple_response.json()
+                    if isinstance(simple_data, list):
+                        return simple_data
+                return []
+            
+            all_responses = list(first_page)
+            
+            if len(first_page) > page_size:
+                # Endpoint ignored pagination and returned everything
+                return all_responses
+            
+            if len(first_page) == page_size:
+                if response_count is None:
+                    response_count = self.get_response_count(search_id)
+                total_pages = min(max(-(-(response_count or 0) // page_size), 2), max_pages)
                 
-                print(f"Fetching responses page {page} (size: {page_size})...")
-                response = self.session.get(responses_url, params=params)
+                pages = self._fetch_pages(search_id, 1, total_pages, page_size, first_page)
+                for page in pages:
+                    all_responses.extend(page)
                 
-                if response.status_code == 200:
-                    page_data = response.json()
-                    
-                    # Handle different possible response structures
-                    if isinstance(page_data, list):
-                        # Direct list of responses
-                        responses = page_data
-                    elif isinstance(page_data, dict):
-                        # Paginated response
-                        responses = page_data.get('responses', page_data.get('data', []))
-                        
-                        # Check if this is the last page
-                        if 'hasNextPage' in page_data and not page_data['hasNextPage']:
-                            all_responses.extend(responses)
-                            break
-                        elif 'totalPages' in page_data and page >= page_data['totalPages'] - 1:
-                            all_responses.extend(responses)
-                            break
-                    else:
-                        print(f"Unexpected response type: {type(page_data)}")
-                        break
-                    
-                    if not responses:
-                        # No more responses
-                        break
-                    
-                    all_responses.extend(responses)
-                    print(f"Got {len(responses)} responses on page {page} (total: {len(all_responses)})")
-                    
-                    # If we got fewer than page_size, we're probably done
-                    if len(responses) < page_size:
-                        break
-                    
-                    page += 1
-                    
-                    # Safety limit
-                    if page > 20:  # Max 20 pages
-                        print("Reached page limit, stopping...")
+                # More responses may have arrived since the count was taken
+                next_page = 1 + len(pages)
+                while pages and len(pages[-1]) == page_size and next_page < max_pages:
+                    page = self._get_responses_page(search_id, next_page, page_size)
+                    if not isinstance(page, list) or not page or page == pages[-1]:
                         break
-                        
-                elif response.status_code == 404:
-                    print("Responses endpoint returned 404, trying alternative method...")
-                    # Try without pagination
-                    simple_response = self.session.get(f"{self.base_url}/api/v0/searches/{search_id}/responses")
-                    if simple_response.status_code == 200:
-                        simple_data = simple_response.json()
-                        if isinstance(simple_data, list):
-                            return simple_data
-                    break
-                else:
-                    print(f"Failed to get responses: HTTP {response.status_code} - {response.text}")
-                    break
+                    all_responses.extend(page)
+                    pages = [page]
+                    next_page += 1
+                
+                if next_page >= max_pages:
+                    print("Reached page limit, stopping...")
             
             print(f"Total responses fetched: {len(all_responses)}")
             return all_responses
@@ -253,6 +1372,226 @@ class SlskdClient:
             traceback.print_exc()
             return []
     
+    def get_response_count(self, search_id):
+        """Return the current responseCount of a search, or None."""
+        response = self.session.get(f"{self.base_url}/api/v0/searches/{search_id}")
+        if response.status_code == 200:
+            return response.json().get('responseCount')
+        return None
+    
+    def _get_responses_page(self, search_id, page, page_size):
+        """Fetch one page of responses; returns a list, 'not_found' or None."""
+        responses_url = f"{self.base_url}/api/v0/searches/{search_id}/responses"
+        response = self.session.get(responses_url, params={'pageIndex': page, 'pageSize': page_size})
+        
+        if response.status_code == 404:
+            return 'not_found'
+        if response.status_code != 200:
+            print(f"Failed to get responses page {page}: HTTP {response.status_code} - {response.text}")
+            return None
+        
+        page_data = response.json()
+        # Handle different possible response structures
+        if isinstance(page_data, dict):
+            page_data = page_data.get('responses', page_data.get('data', []))
+        if not isinstance(page_data, list):
+            print(f"Unexpected response type: {type(page_data)}")
+            return None
+        return page_data
+    
+    def _fetch_pages(self, search_id, first, last, page_size, previous=None):
+        """Fetch pages [first, last) concurrently and return them in order.
+
+        Stops at the first missing, failed or empty page, and at a page that
+        repeats the one before it (`previous` for the first), which is what
+        slskd returns when it ignores pagination.
+        """
+        page_numbers = list(range(first, last))
+        if not page_numbers:
+            return []
+        
+        print(f"Fetching responses pages {first}-{last - 1} concurrently...")
+        workers = min(self.max_parallel_requests, len(page_numbers))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda page: self._get_responses_page(search_id, page, page_size),
+                page_numbers
+            ))
+        
+        pages = []
+        for page in results:
+            if not isinstance(page, list) or not page or page == previous:
+                break
+            pages.append(page)
+            previous = page
+            if len(page) < page_size:
+                break
+        return pages
+    
+    def search_streaming(self, query, timeout=30, on_responses=None, cancel_event=None, poll_interval=1.0):
+        """Search for files, handing new responses to `on_responses` as they arrive.
+
+        Each poll only fetches responses that have not been seen yet. The
+        search is stopped on slskd as soon as `cancel_event` is set (the
+        callback may set it itself). Returns every response received.
+
+        Cached responses of a search that was stopped early are handed to
+        `on_responses` first; the network is only searched again when they
+        don't make the callback set `cancel_event`.
+        """
+        cancel_event = cancel_event or threading.Event()
+        
+        cached = self.get_cached_results(query)
+        if cached is not None:
+            responses, partial = cached
+            print(f"Using cached slskd results for: {query} ({len(responses)} responses"
+                  f"{', partial' if partial else ''})")
+            if on_responses:
+                on_responses(responses)
+            if not partial or cancel_event.is_set():
+                return responses
+            print(f"Partial cached results for {query} were not enough, searching again")
+        
+        seen = []
+        finished = False
+        
+        try:
+            print(f"Starting streaming slskd search: {query}")
+            
+            response = self.session.post(f"{self.base_url}/api/v0/searches", json={
+                'searchText': query,
+                'timeout': timeout * 1000  # Convert to milliseconds
+            })
+            if response.status_code not in [200, 201]:
+                print(f"Failed to start search: HTTP {response.status_code} - {response.text}")
+                return []
+            
+            search_id = response.json().get('id')
+            results_url = f"{self.base_url}/api/v0/searches/{search_id}"
+            start_time = time.time()
+            
+            while True:
+                if cancel_event.is_set():
+                    print(f"Search {search_id} cancelled after {len(seen)} responses, stopping it on slskd")
+                    self.stop_search(search_id)
+                    break
+                
+                response = self.session.get(results_url)
+                if response.status_code != 200:
+                    print(f"Failed to get search status: HTTP {response.status_code}")
+                    break
+                
+                search_data = response.json()
+                state = search_data.get('state', 'Unknown')
+                is_complete = search_data.get('isComplete', False) or state in ['Completed', 'TimedOut', 'Cancelled']
+                timed_out = time.time() - start_time >= timeout
+                
+                if search_data.get('responseCount', 0) > len(seen) or is_complete or timed_out:
+                    new_responses = self.get_new_responses(search_id, len(seen), search_data.get('responseCount'))
+                    if new_responses:
+                        seen.extend(new_responses)
+                        print(f"Search {search_id}: {len(new_responses)} new responses ({len(seen)} total)")
+                        if on_responses:
+                            on_responses(new_responses)
+                
+                if is_complete or timed_out:
+                    print(f"Search {search_id} finished with state: {state}, {len(seen)} responses")
+                    finished = True
+                    break
+                
+                # Wait before next check (wakes up early on cancel)
+                cancel_event.wait(poll_interval)
+            
+            # A search stopped early only saw part of the responses, so it is
+            # cached as partial: reused only while it still satisfies the caller
+            self.cache_results(query, seen, partial=not finished)
+            return seen
+            
+        except Exception as e:
+            print(f"Error in streaming slskd search: {e}")
+            import traceback
+            traceback.print_exc()
+            return seen
+    
+    def get_new_responses(self, search_id, offset, response_count=None, page_size=50, max_pages=21):
+        """Fetch the responses of a search starting at `offset`.
+
+        When `response_count` is known, all pages past the offset are
+        requested concurrently. At most `max_pages` pages are fetched.
+        """
+        first = offset // page_size
+        skip = offset % page_size
+        
+        page_data = self._get_responses_page(search_id, first, page_size)
+        if not isinstance(page_data, list):
+            return []
+        
+        if len(page_data) > page_size:
+            # Endpoint ignored pagination and returned everything
+            return page_data[offset:]
+        
+        new_responses = page_data[skip:]
+        if len(page_data) < page_size:
+            return new_responses
+        
+        page_limit = first + max_pages
+        last = min(max(-(-(response_count or 0) // page_size), first + 2), page_limit)
+        next_page = first + 1
+        previous = page_data
+        while True:
+            pages = self._fetch_pages(search_id, next_page, last, page_size, previous)
+            for page in pages:
+                new_responses.extend(page)
+            if len(pages) < last - next_page or len(pages[-1]) < page_size:
+                break
+            if last >= page_limit:
+                print("Reached page limit, stopping...")
+                break
+            # Every page was full; there may be more than the count said
+            previous = pages[-1]
+            next_page, last = last, last + 1
+        
+        return new_responses
+    
+    def stop_search(self, search_id):
+        """Stop a running search on slskd."""
+        try:
+            response = self.session.put(f"{self.base_url}/api/v0/searches/{search_id}")
+            if response.status_code not in [200, 204]:
+                print(f"Failed to stop search {search_id}: HTTP {response.status_code}")
+        except Exception as e:
+            print(f"Error stopping search {search_id}: {e}")
+    
+    def get_all_downloads(self):
+        """Return every download transfer slskd knows about in one call, as
+        a flat list of file transfers, or None if slskd can't be reached."""
+        try:
+            response = self.session.get(f"{self.base_url}/api/v0/transfers/downloads", timeout=30)
+            if response.status_code != 200:
+                print(f"Failed to get downloads: HTTP {response.status_code}")
+                return None
+            transfers = []
+            for user in response.json():
+                for directory in user.get('directories', []):
+                    for transfer in directory.get('files', []):
+                        transfer.setdefault('username', user.get('username'))
+                        transfers.append(transfer)
+            return transfers
+        except Exception as e:
+            print(f"Error getting downloads: {e}")
+            return None
+    
+    def cancel_download(self, username, transfer_id):
+        """Cancel a download transfer; returns True on success."""
+        try:
+            response = self.session.delete(
+                f"{self.base_url}/api/v0/transfers/downloads/{urllib.parse.quote(username)}/{transfer_id}"
+            )
+            return response.status_code in [200, 204]
+        except Exception as e:
+            print(f"Error cancelling download {transfer_id}: {e}")
+            return False
+    
     def download_files(self, username, files):
         """Download files from a user."""
         try:
@@ -296,165 +1635,331 @@ class SlskdClient:
             traceback.print_exc()
             return False
 
-def calculate_album_score(matching_files, artist, title, expected_track_count=None):
-    """Calculate a score for a potential album download."""
-    if not matching_files:
-        return 0
-    
-    score = 0
+def score_album(matching_files, expected_track_count=None):
+    """Score a potential album download in a single pass over its files.
+
+    Returns a dict with the final 'score' (never negative), the raw 'total',
+    a 'breakdown' list of (reason, points) pairs and the per-file 'stats'
+    the rules were evaluated on.
+    """
     num_tracks = len(matching_files)
+    if not num_tracks:
+        return {'score': 0, 'total': 0, 'breakdown': [], 'stats': {}}
     
-    # Track count matching is now the most important factor
-    if expected_track_count and expected_track_count > 0:
-        track_diff = abs(num_tracks - expected_track_count)
-        if track_diff == 0:
-            score += 50  # Perfect match
-            print(f"      PERFECT track count match: {num_tracks}")
-        elif track_diff <= 1:
-            score += 35  # Very close match (within 1 track)
-            print(f"      Excellent track count match: {num_tracks} (±{track_diff})")
-        elif track_diff <= 2:
-            score += 25  # Close match (within 2 tracks)
-            print(f"      Good track count match: {num_tracks} (±{track_diff})")
-        elif track_diff <= 5:
-            score += 10  # Reasonable match
-            print(f"      Fair track count match: {num_tracks} (±{track_diff})")
-        else:
-            score -= 10  # Poor match
-            print(f"      Poor track count match: {num_tracks} (±{track_diff})")
-    else:
-        # If we don't know expected count, use old logic but with less weight
-        score += min(num_tracks * 1, 20)  # Reduced from 2 to 1, max 20 instead of 30
-        print(f"      No expected track count, using count-based scoring: {num_tracks} tracks")
-    
-    # Bonus for both artist and title matches
-    both_matches = sum(1 for f in matching_files if f['artist_match'] and f['title_match'])
-    artist_only = sum(1 for f in matching_files if f['artist_match'] and not f['title_match'])
-    title_only = sum(1 for f in matching_files if not f['artist_match'] and f['title_match'])
-    
-    score += both_matches * 5   # Best: both artist and title
-    score += artist_only * 3    # Good: artist match
-    score += title_only * 2     # OK: title match
-    
-    print(f"      Match quality: {both_matches} both, {artist_only} artist-only, {title_only} title-only")
-    
-    # File format and quality bonuses (MP3 320 preferred)
-    mp3_files = sum(1 for f in matching_files if '.mp3' in f['filename'])
-    m4a_files = sum(1 for f in matching_files if '.m4a' in f['filename'])
-    ogg_files = sum(1 for f in matching_files if '.ogg' in f['filename'])
-    wav_files = sum(1 for f in matching_files if '.wav' in f['filename'])
-    
-    # Check for MP3 320kbps indicators
-    mp3_320_files = 0
-    mp3_vbr_files = 0
-    mp3_low_quality = 0
+    both = artist_only = title_only = 0
+    mp3 = m4a = ogg = wav = mp3_320 = mp3_vbr = mp3_low = 0
+    in_folder = good_size = huge = tiny = 0
     
     for f in matching_files:
         filename = f['filename']
         size = f['size']
         
+        if f['artist_match']:
+            if f['title_match']:
+                both += 1
+            else:
+                artist_only += 1
+        elif f['title_match']:
+            title_only += 1
+        
         if '.mp3' in filename:
-            # Estimate bitrate from file size (rough calculation)
-            # Assume 3-5 minute average track length
-            estimated_bitrate = (size * 8) / (4 * 60)  # bits per second for 4-minute track
-            estimated_kbps = estimated_bitrate / 1000
-            
-            # Check filename for quality indicators
-            if any(indicator in filename for indicator in ['320', '320k', '320kbps']):
-                mp3_320_files += 1
-            elif any(indicator in filename for indicator in ['vbr', 'v0', 'v2']):
-                mp3_vbr_files += 1
+            mp3 += 1
+            # Estimate bitrate from file size, assuming a 4 minute track
+            estimated_kbps = size * 8 / 240000
+            if '320' in filename:
+                mp3_320 += 1
+            elif 'vbr' in filename or 'v0' in filename or 'v2' in filename:
+                mp3_vbr += 1
             elif estimated_kbps >= 280:  # Likely 320kbps based on size
-                mp3_320_files += 1
+                mp3_320 += 1
             elif estimated_kbps >= 200:  # Likely VBR or 256kbps
-                mp3_vbr_files += 1
+                mp3_vbr += 1
             elif estimated_kbps < 150:  # Likely low quality
-                mp3_low_quality += 1
+                mp3_low += 1
+            # MP3 320kbps is roughly 2.4MB per minute, so 6-15MB per track
+            if 6291456 <= size <= 15728640:
+                good_size += 1
+        elif size > 1048576:  # At least 1MB for other formats
+            good_size += 1
+        if '.m4a' in filename:
+            m4a += 1
+        if '.ogg' in filename:
+            ogg += 1
+        if '.wav' in filename:
+            wav += 1
+        
+        if '/' in f['file'].get('filename', ''):
+            in_folder += 1
+        if size > 50000000:
+            huge += 1
+        elif size < 2000000:
+            tiny += 1
     
-    # Scoring based on format and quality
-    if mp3_320_files > num_tracks * 0.8:  # Mostly MP3 320
-        score += 20
-        print(f"      Mostly MP3 320kbps: +20")
-    elif mp3_320_files > 0:
-        score += 15
-        print(f"      Some MP3 320kbps: +15")
-    elif mp3_vbr_files > num_tracks * 0.6:  # Mostly MP3 VBR
-        score += 12
-        print(f"      Mostly MP3 VBR3 VBR: +12")
-    elif mp3_files > num_tracks * 0.8:  # Mostly MP3 (unknown quality)
-        score += 8
-        print(f"      Mostly MP3: +8")
-    elif m4a_files > 0:
-        score += 6
-        print(f"      M4A files: +6")
-    elif ogg_files > 0:
-        score += 4
-        print(f"      OGG files: +4")
-    elif wav_files > 0:
-        score += 3  # WAV is lossless but huge
-        print(f"      WAV files: +3")
+    stats = {
+        'both': both, 'artist_only': artist_only, 'title_only': title_only,
+        'mp3': mp3, 'm4a': m4a, 'ogg': ogg, 'wav': wav,
+        'mp3_320': mp3_320, 'mp3_vbr': mp3_vbr, 'mp3_low': mp3_low,
+        'in_folder': in_folder, 'good_size': good_size, 'huge': huge, 'tiny': tiny
+    }
     
-    # Penalty for low quality MP3s
-    if mp3_low_quality > 0:
-        penalty = mp3_low_quality * 5
-        score -= penalty
-        print(f"      Low quality MP3 penalty: -{penalty}")
+    breakdown = []
     
-    # Bonus for organized structure (files in folders)
-    folder_files = sum(1 for f in matching_files if '/' in f['file'].get('filename', ''))
-    if folder_files > num_tracks * 0.7:  # Most files are in folders
-        score += 10
-        print(f"      Well organized (in folders): +10")
-    elif folder_files > 0:
-        score += 5
-        print(f"      Partially organized: +5")
+    # Track count matching is the most important factor
+    if expected_track_count and expected_track_count > 0:
+        track_diff = abs(num_tracks - expected_track_count)
+        if track_diff == 0:
+            breakdown.append((f'Perfect track count match: {num_tracks}', 50))
+        elif track_diff <= 1:
+            breakdown.append((f'Excellent track count match: {num_tracks} (±{track_diff})', 35))
+        elif track_diff <= 2:
+            breakdown.append((f'Good track count match: {num_tracks} (±{track_diff})', 25))
+        elif track_diff <= 5:
+            breakdown.append((f'Fair track count match: {num_tracks} (±{track_diff})', 10))
+        else:
+            breakdown.append((f'Poor track count match: {num_tracks} (±{track_diff})', -10))
+    else:
+        breakdown.append((f'No expected track count, {num_tracks} tracks', min(num_tracks, 20)))
     
-    # Bonus for reasonable file sizes for MP3 320
-    # MP3 320kbps: roughly 2.4MB per minute, so 8-12MB for typical 3-5 minute track
-    good_size_files = 0
-    for f in matching_files:
-        size_mb = f['size'] / (1024 * 1024)
-        if '.mp3' in f['filename']:
-            if 6 <= size_mb <= 15:  # Good size for MP3 320
-                good_size_files += 1
-        elif size_mb > 1:  # At least 1MB for other formats
-            good_size_files += 1
+    breakdown.append((
+        f"Match quality: {stats['both']} both, {stats['artist_only']} artist-only, {stats['title_only']} title-only",
+        stats['both'] * 5 + stats['artist_only'] * 3 + stats['title_only'] * 2
+    ))
+    
+    # File format and quality (MP3 320 preferred)
+    if stats['mp3_320'] > num_tracks * 0.8:
+        breakdown.append(('Mostly MP3 320kbps', 20))
+    elif stats['mp3_320'] > 0:
+        breakdown.append(('Some MP3 320kbps', 15))
+    elif stats['mp3_vbr'] > num_tracks * 0.6:
+        breakdown.append(('Mostly MP3 VBR', 12))
+    elif stats['mp3'] > num_tracks * 0.8:
+        breakdown.append(('Mostly MP3', 8))
+    elif stats['m4a'] > 0:
+        breakdown.append(('M4A files', 6))
+    elif stats['ogg'] > 0:
+        breakdown.append(('OGG files', 4))
+    elif stats['wav'] > 0:
+        breakdown.append(('WAV files', 3))  # Lossless but huge
     
-    if good_size_files == num_tracks:
-        score += 8
-        print(f"      All files good size for quality: +8")
-    elif good_size_files > num_tracks * 0.8:
-        score += 5
-        print(f"      Most files good size: +5")
+    if stats['mp3_low'] > 0:
+        breakdown.append((f"{stats['mp3_low']} low quality MP3s", -stats['mp3_low'] * 5))
     
-    # Check for very large files (might be videos or uncompressed)
-    huge_files = sum(1 for f in matching_files if f['size'] > 50000000)  # > 50MB
-    if huge_files > 0:
-        score -= huge_files * 3
-        print(f"      {huge_files} suspiciously large files: -{huge_files * 3}")
+    if stats['in_folder'] > num_tracks * 0.7:
+        breakdown.append(('Well organized (in folders)', 10))
+    elif stats['in_folder'] > 0:
+        breakdown.append(('Partially organized', 5))
     
-    # Check for very small files (might be low quality or corrupted)
-    tiny_files = sum(1 for f in matching_files if f['size'] < 2000000)  # < 2MB
-    if tiny_files > 0:
-        score -= tiny_files * 2
-        print(f"      {tiny_files} suspiciously small files: -{tiny_files * 2}")
+    if stats['good_size'] == num_tracks:
+        breakdown.append(('All files good size for quality', 8))
+    elif stats['good_size'] > num_tracks * 0.8:
+        breakdown.append(('Most files good size', 5))
     
-    # Penalty for very few tracks (likely not a full album)
+    # Very large files might be videos, very small ones low quality or corrupted
+    if stats['huge'] > 0:
+        breakdown.append((f"{stats['huge']} suspiciously large files", -stats['huge'] * 3))
+    if stats['tiny'] > 0:
+        breakdown.append((f"{stats['tiny']} suspiciously small files", -stats['tiny'] * 2))
+    
+    # Very few tracks is likely not a full album
     if num_tracks < 3:
-        score -= 15
-        print(f"      Too few tracks penalty: -15")
+        breakdown.append(('Too few tracks', -15))
     elif num_tracks < 5:
-        score -= 5
-        print(f"      Few tracks penalty: -5")
+        breakdown.append(('Few tracks', -5))
     
-    # Bonus for typical album track counts
     if 8 <= num_tracks <= 20:
-        score += 5
-        print(f"      Typical album length: +5")
+        breakdown.append(('Typical album length', 5))
     
-    final_score = max(score, 0)  # Don't return negative scores
-    print(f"      Final score: {final_score}")
-    return final_score
+    total = sum(points for _, points in breakdown)
+    return {'score': max(total, 0), 'total': total, 'breakdown': breakdown, 'stats': stats}
+
+def log_score_breakdown(result):
+    for reason, points in result['breakdown']:
+        print(f"      {reason}: {points:+d}")
+    print(f"      Final score: {result['score']}")
+
+def calculate_album_score(matching_files, artist, title, expected_track_count=None):
+    """Calculate a score for a potential album download."""
+    result = score_album(matching_files, expected_track_count)
+    if SLSKD_CONFIG['verbose_scoring']:
+        log_score_breakdown(result)
+    return result['score']
+
+class CandidatePool:
+    """Thread-safe pool of download candidates merged from several searches.
+
+    Candidates with the same username and file paths are deduplicated,
+    keeping the highest score.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._candidates = {}
+
+    def add(self, candidates):
+        """Merge candidates into the pool and return the best score so far."""
+        with self._lock:
+            for candidate in candidates:
+                key = (candidate['username'], frozenset(f.get('filename') for f in candidate['files']))
+                existing = self._candidates.get(key)
+                if existing is None or candidate['score'] > existing['score']:
+                    self._candidates[key] = candidate
+            return self._best_score()
+
+    def _best_score(self):
+        return max((c['score'] for c in self._candidates.values()), default=0)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._candidates)
+
+    def ranked(self):
+        """Return candidates sorted by score, highest first."""
+        with self._lock:
+            return sorted(self._candidates.values(), key=lambda x: x['score'], reverse=True)
+
+AUDIO_EXTENSIONS = frozenset(('mp3', 'm4a', 'ogg', 'wav'))  # No FLAC
+
+class AlbumMatcher:
+    """Matches slskd file paths against an album's artist and title keywords.
+
+    Built once per album. Names and paths are Unicode-normalized (accents
+    stripped, case folded) and split into word tokens, and every keyword maps
+    to a bitmask, so matching a path is one pass over its tokens with a dict
+    lookup each, however many keywords there are. Directory tokens are cached
+    since a response usually holds many files per folder.
+    """
+
+    ARTIST = 1
+    TITLE = 2
+    TOKEN_RE = re.compile(r'[^\W_]+')
+
+    def __init__(self, artist, title):
+        self.keywords = {}
+        self._add_keywords(artist, self.ARTIST)
+        self._add_keywords(title, self.TITLE)
+        self._dir_cache = {}
+
+    @classmethod
+    def tokenize(cls, text):
+        if not text.isascii():
+            text = ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+        return cls.TOKEN_RE.findall(text.casefold())
+
+    def _add_keywords(self, name, flag):
+        tokens = self.tokenize(name or '')
+        words = {token for token in tokens if len(token) > 2}
+        if len(tokens) > 1:
+            # Also match the name written without separators ("AC/DC", "DaftPunk")
+            words.add(''.join(tokens))
+        for word in words:
+            self.keywords[word] = self.keywords.get(word, 0) | flag
+
+    def _mask(self, tokens):
+        keywords = self.keywords
+        mask = 0
+        previous = None
+        for token in tokens:
+            mask |= keywords.get(token, 0)
+            if previous:
+                mask |= keywords.get(previous + token, 0)
+            if mask == 3:
+                break
+            previous = token
+        return mask
+
+    def match(self, path):
+        """Return (artist_match, title_match) for a file path."""
+        split = max(path.rfind('\\'), path.rfind('/'))
+        directory = path[:split] if split >= 0 else ''
+        mask = self._dir_cache.get(directory)
+        if mask is None:
+            mask = self._dir_cache[directory] = self._mask(self.tokenize(directory))
+        if mask != 3:
+            mask |= self._mask(self.tokenize(path[split + 1:]))
+        return bool(mask & self.ARTIST), bool(mask & self.TITLE)
+
+    @staticmethod
+    def is_audio(path):
+        return path.rpartition('.')[2].lower() in AUDIO_EXTENSIONS
+
+DISC_FOLDER_RE = re.compile(r'^(cd|dis[ck])\s*[-_.]?\s*\d+\b', re.IGNORECASE)
+
+def album_folder(path):
+    """Return the album folder of a file path, treating CD1/Disc 2 style
+    subfolders as part of their parent."""
+    folder = path[:max(path.rfind('\\'), path.rfind('/'), 0)]
+    split = max(folder.rfind('\\'), folder.rfind('/'))
+    if split > 0 and DISC_FOLDER_RE.match(folder[split + 1:]):
+        folder = folder[:split]
+    return folder
+
+def local_download_path(download_dir, remote_path):
+    """Where slskd saves a remote file: <download_dir>/<remote parent folder>/<file name>."""
+    return os.path.join(download_dir, *re.split(r'[\\/]', remote_path)[-2:])
+
+def build_candidates(results, matcher, expected_track_count, query):
+    """Turn the user responses of one slskd search into scored candidates.
+
+    Each album folder in a response (disc subfolders merged) is scored as a
+    separate candidate, so only the winning folder gets downloaded.
+    """
+    candidates = []
+    verbose = SLSKD_CONFIG['verbose_scoring']
+    
+    for response_idx, response in enumerate(results):
+        username = response.get('username', '')
+        files = response.get('files', [])
+        
+        if verbose:
+            print(f"  User {response_idx + 1}: {username} ({len(files)} files)")
+        
+        # Look for audio files that might match our album, grouped by folder
+        folders = {}
+        for file_info in files:
+            path = file_info.get('filename', '')
+            if not matcher.is_audio(path):
+                continue
+            
+            # Check if artist and title keywords are in the path/filename
+            artist_match, title_match = matcher.match(path)
+            if artist_match or title_match:
+                folders.setdefault(album_folder(path), []).append({
+                    'file': file_info,
+                    'filename': path.lower(),
+                    'size': file_info.get('size', 0),
+                    'artist_match': artist_match,
+                    'title_match': title_match
+                })
+        
+        for folder, matching_files in folders.items():
+            track_count = len(matching_files)
+            result = score_album(matching_files, expected_track_count)
+            score = result['score']
+            
+            if verbose:
+                print(f"    {folder or '(root)'}: {track_count} matching audio files")
+                log_score_breakdown(result)
+            
+            if score > 0:
+                candidates.append({
+                    'username': username,
+                    'folder': folder,
+                    'files': [f['file'] for f in matching_files],
+                    'matching_files': matching_files,
+                    'score': score,
+                    'score_breakdown': result['breakdown'],
+                    'query': query,
+                    'track_count': track_count,
+                    'track_diff': abs(track_count - expected_track_count) if expected_track_count else 0
+                })
+                
+                if verbose:
+                    print(f"    Added candidate with score {score} ({track_count} tracks)")
+                    for i, mf in enumerate(matching_files[:3]):
+                        file_size_mb = round(mf['size'] / (1024 * 1024), 1)
+                        print(f"      Sample {i+1}: {mf['filename'][:60]}... ({file_size_mb}MB)")
+    
+    return candidates
 
 def search_and_download_album(album_info):
     """Search for and download an album using slskd."""
@@ -467,6 +1972,9 @@ def search_and_download_album(album_info):
         title = album_info['title']
         mb_id = album_info['mb_id']
         expected_track_count = album_info.get('track_count', 0)
+        job_id = album_info.get('job_id')
+        # Peers whose earlier download for this album failed or stalled
+        excluded_peers = set(album_info.get('exclude_peers') or [])
         
         print(f"=== Starting download search for {artist} - {title} ===")
         if expected_track_count:
@@ -482,109 +1990,63 @@ def search_and_download_album(album_info):
             f'{title} {artist}',      # Reverse order
         ]
         
-        all_candidates = []
-        
-        for query_idx, query in enumerate(search_queries):
-            print(f"Search attempt {query_idx + 1}/{len(search_queries)}: {query}")
-            
-            # Use longer timeout for better results
-            results = slskd_client.search(query, timeout=45)
-            
-            if not results:
-                print(f"  No results for query: {query}")
-                continue
-            
-            print(f"  Got {len(results)} user responses")
+        pool = CandidatePool()
+        matcher = AlbumMatcher(artist, title)
+        cancel_event = threading.Event()
+        score_threshold = SLSKD_CONFIG['score_threshold']
+        
+        job_store.update(job_id, state='searching', query=search_queries[0])
+        
+        def make_scorer(query):
+            def on_responses(responses):
+                # Score responses as they stream in and stop every search
+                # as soon as one candidate is clearly good enough
+                if excluded_peers:
+                    responses = [r for r in responses if r.get('username') not in excluded_peers]
+                best_score = pool.add(build_candidates(responses, matcher, expected_track_count, query))
+                job_store.update(job_id, query=query, candidates=len(pool))
+                if cancel_event.is_set():
+                    return
+                if score_threshold and best_score >= score_threshold:
+                    print(f"Candidate scored {best_score} (threshold {score_threshold}), cancelling searches")
+                    cancel_event.set()
+                elif len(pool) >= 3:
+                    # Enough good candidates, we don't need the other queries
+                    print(f"Found {len(pool)} candidates, cancelling remaining searches")
+                    cancel_event.set()
+            return on_responses
+        
+        # Run all query variants at once and merge results as they arrive
+        with ThreadPoolExecutor(max_workers=len(search_queries)) as executor:
+            futures = {}
+            for query_idx, query in enumerate(search_queries):
+                print(f"Search attempt {query_idx + 1}/{len(search_queries)}: {query}")
+                # Use longer timeout for better results
+                future = executor.submit(
+                    slskd_client.search_streaming, query, 45,
+                    make_scorer(query), cancel_event, SLSKD_CONFIG['poll_interval']
+                )
+                futures[future] = query
             
-            # Analyze results and find potential matches
-            for response_idx, response in enumerate(results):
-                username = response.get('username', '')
-                files = response.get('files', [])
+            for future in as_completed(futures):
+                query = futures[future]
+                results = future.result()
                 
-                print(f"  User {response_idx + 1}: {username} ({len(files)} files)")
+                if not results:
+                    print(f"  No results for query: {query}")
+                    continue
                 
-                # Look for audio files that might match our album
-                matching_files = []
-                for file_info in files:
-                    filename = file_info.get('filename', '').lower()
-                    size = file_info.get('size', 0)
-                    
-                    # Check if it's an audio file (no FLAC)
-                    if any(ext in filename for ext in ['.mp3', '.m4a', '.ogg', '.wav']):
-                        # Check if artist and title keywords are in the path/filename
-                        artist_words = [word.lower() for word in artist.split() if len(word) > 2]
-                        title_words = [word.lower() for word in title.split() if len(word) > 2]
-                        
-                        artist_match = any(word in filename for word in artist_words)
-                        title_match = any(word in filename for word in title_words)
-                        
-                        if artist_match or title_match:
-                            matching_files.append({
-                                'file': file_info,
-                                'filename': filename,
-                                'size': size,
-                                'artist_match': artist_match,
-                                'title_match': title_match
-                            })
-                
-                if matching_files:
-                    track_count = len(matching_files)
-                    print(f"    Found {track_count} matching audio files")
-                    
-                    # Score this collection of files with expected track count
-                    score = calculate_album_score(matching_files, artist, title, expected_track_count)
-                    
-                    if score > 0:
-                        candidate = {
-                            'username': username,
-                            'files': [f['file'] for f in matching_files],
-                            'matching_files': matching_files,
-                            'score': score,
-                            'query': query,
-                            'track_count': track_count,
-                            'track_diff': abs(track_count - expected_track_count) if expected_track_count else 0
-                        }
-                        all_candidates.append(candidate)
-                        
-                        track_match_info = ""
-                        if expected_track_count:
-                            diff = abs(track_count - expected_track_count)
-                            if diff == 0:
-                                track_match_info = " (PERFECT TRACK MATCH)"
-                            elif diff <= 2:
-                                track_match_info = f" (±{diff} tracks)"
-                            else:
-                                track_match_info = f" ({diff} tracks off)"
-                        
-                        print(f"    Added candidate with score {score} ({track_count} tracks{track_match_info})")
-                        
-                        # Show some sample files for debugging
-                        for i, mf in enumerate(matching_files[:3]):
-                            file_size_mb = round(mf['size'] / (1024 * 1024), 1)
-                            print(f"      Sample {i+1}: {mf['filename'][:60]}... ({file_size_mb}MB)")
-                        
-                        # Show file format breakdown
-                        format_counts = {}
-                        for mf in matching_files:
-                            for ext in ['.mp3', '.m4a', '.ogg', '.wav']:
-                                if ext in mf['filename']:
-                                    format_counts[ext] = format_counts.get(ext, 0) + 1
-                                    break
-                        if format_counts:
-                            format_str = ", ".join([f"{count}{ext}" for ext, count in format_counts.items()])
-                            print(f"      Formats: {format_str}")
-            
-            # If we found some good candidates, we might not need to try more queries
-            if len(all_candidates) >= 3:
-                print(f"Found {len(all_candidates)} candidates, stopping search")
-                break
+                print(f"  Got {len(results)} user responses for query: {query}")
+        
+        all_candidates = pool.ranked()
         
         if not all_candidates:
             print(f"No suitable candidates found for {artist} - {title}")
+            job_store.update(job_id, state='failed', candidates=0, message='No suitable candidates found')
+            mark_album_download_failed(mb_id)
             return False
         
-        # Sort candidates by score (highest first)
-        all_candidates.sort(key=lambda x: x['score'], reverse=True)
+        job_store.update(job_id, candidates=len(all_candidates))
         
         print(f"\nFound {len(all_candidates)} total candidates:")
         for i, candidate in enumerate(all_candidates[:5]):  # Show top 5
@@ -598,7 +2060,7 @@ def search_and_download_album(album_info):
                 else:
                     track_match = f" (-{diff})"
             
-            print(f"  {i+1}. User: {candidate['username']}")
+            print(f"  {i+1}. User: {candidate['username']}, folder: {candidate['folder']}")
             print(f"     Score: {candidate['score']}, Tracks: {candidate['track_count']}{track_match}")
             print(f"     Query: {candidate['query']}")
         
@@ -608,7 +2070,7 @@ def search_and_download_album(album_info):
         
         for i in range(attempts):
             candidate = all_candidates[i]
-            print(f"\nAttempting download {i+1}/{attempts} from {candidate['username']}")
+            print(f"\nAttempting download {i+1}/{attempts} from {candidate['username']}: {candidate['folder']}")
             print(f"  Score: {candidate['score']}, Tracks: {candidate['track_count']}")
             
             # Show what we're about to download
@@ -619,6 +2081,17 @@ def search_and_download_album(album_info):
                 print(f"✓ Successfully started download from {candidate['username']}")
                 print(f"  Downloading {candidate['track_count']} tracks")
                 mark_album_downloading(mb_id)
+                job_store.update(
+                    job_id,
+                    state='downloading',
+                    chosen_peer=candidate['username'],
+                    chosen_files=[f.get('filename') for f in candidate['files']],
+                    message=f"Downloading {candidate['track_count']} tracks (score {candidate['score']})",
+                    bytes_total=sum(f.get('size', 0) for f in candidate['files']),
+                    bytes_transferred=0,
+                    files_done=0,
+                    progress_updated=time.time()
+                )
                 downloaded = True
                 break
             else:
@@ -631,6 +2104,8 @@ def search_and_download_album(album_info):
                 best = all_candidates[0]
                 print(f"Best candidate had {best['track_count']} tracks (expected: {expected_track_count})")
                 print(f"Best candidate score: {best['score']}")
+            job_store.update(job_id, state='failed', message='Could not start a download from any candidate')
+            mark_album_download_failed(mb_id)
         
         return downloaded
             
@@ -638,52 +2113,1172 @@ def search_and_download_album(album_info):
         print(f"Error searching/downloading album: {e}")
         import traceback
         traceback.print_exc()
+        job_store.update(album_info.get('job_id'), state='failed', message=str(e))
+        mark_album_download_failed(album_info.get('mb_id'))
+        return False
+
+def mark_album_downloading(mb_id):
+    """Mark an album as currently being downloaded."""
+    try:
+        if not beets_interface.wishlist_db_path:
+            return
+        
+        with wishlist_db.connection() as conn:
+            conn.execute('''
+                UPDATE wishlist 
+                SET download_status = "downloading", download_started = ?
+                WHERE mb_id = ?
+            ''', (time.time(), mb_id))
+        
+        print(f"Marked album as downloading: {mb_id}")
+        
+    except Exception as e:
+        print(f"Error marking album as downloading: {e}")
+
+def mark_album_downloaded(mb_id):
+    """Mark an album's download as finished."""
+    try:
+        if not beets_interface.wishlist_db_path or not mb_id:
+            return
+        
+        with wishlist_db.connection() as conn:
+            conn.execute(
+                "UPDATE wishlist SET download_status = 'downloaded' WHERE mb_id = ?", (mb_id,)
+            )
+        
+    except Exception as e:
+        print(f"Error marking album as downloaded: {e}")
+
+def mark_album_download_failed(mb_id):
+    """Mark an album's download as failed so the release scheduler retries it."""
+    try:
+        if not beets_interface.wishlist_db_path or not mb_id:
+            return
+        
+        with wishlist_db.connection() as conn:
+            conn.execute(
+                "UPDATE wishlist SET download_status = 'failed' WHERE mb_id = ?", (mb_id,)
+            )
+        
+    except Exception as e:
+        print(f"Error marking album download as failed: {e}")
+
+def count_release_tracks(release):
+    """Count the tracks of a MusicBrainz release (lookup or search result)."""
+    track_count = 0
+    if 'medium-list' in release:
+        for medium in release['medium-list']:
+            if 'track-count' in medium:
+                track_count += int(medium['track-count'])
+            elif 'track-list' in medium:
+                track_count += len(medium['track-list'])
+    if not track_count and release.get('medium-track-count'):
+        track_count = int(release['medium-track-count'])
+    return track_count
+
+def parse_release_year(release_date):
+    """Return the year of a YYYY[-MM[-DD]] date, or None."""
+    if release_date:
+        try:
+            if len(release_date) >= 4:
+                return int(release_date[:4])
+        except ValueError:
+            pass
+    return None
+
+def is_date_released(release_date):
+    """Whether a YYYY, YYYY-MM or YYYY-MM-DD release date is today or earlier."""
+    if not release_date:
         return False
+    try:
+        # Parse release date (handle different formats)
+        release_datetime = None
+        
+        if len(release_date) == 10:  # YYYY-MM-DD
+            release_datetime = datetime.strptime(release_date, '%Y-%m-%d')
+        elif len(release_date) == 7:  # YYYY-MM
+            release_datetime = datetime.strptime(release_date + '-01', '%Y-%m-%d')
+        elif len(release_date) == 4:  # YYYY
+            release_datetime = datetime.strptime(release_date + '-01-01', '%Y-%m-%d')
+        
+        if release_datetime:
+            return release_datetime.date() <= datetime.now().date()
+            
+    except ValueError as e:
+        print(f"Could not parse release date {release_date}: {e}")
+    return False
+
+class WishlistDB:
+    """Small thread-safe connection pool for the wishlist database.
+
+    The schema (wishlist and download_jobs tables) is created or migrated
+    once, on first use, and every connection runs in WAL mode so the
+    download workers and the web routes don't block each other.
+    """
+
+    WISHLIST_COLUMNS = {
+        'release_date': 'TEXT',
+        'release_year': 'INTEGER',
+        'track_count': 'INTEGER',
+        'download_status': 'TEXT',
+        'download_started': 'REAL',
+        'download_attempts': 'INTEGER',
+        'next_attempt': 'REAL'
+    }
+
+    JOB_COLUMNS = {
+        'bytes_transferred': 'INTEGER',
+        'bytes_total': 'INTEGER',
+        'speed': 'REAL',
+        'files_done': 'INTEGER',
+        'progress_updated': 'REAL'
+    }
+
+    def __init__(self, db_path, pool_size=4, timeout=10):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._pool = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._migrated = False
+
+    def _new_connection(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.pool_size:
+                self._created += 1
+                try:
+                    return self._new_connection()
+                except Exception:
+                    self._created -= 1
+                    raise
+        return self._pool.get(timeout=self.timeout)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commits on success and rolls back on error."""
+        self.migrate()
+        conn = self._acquire()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.put(conn)
+
+    def migrate(self):
+        """Create missing tables, columns and indexes (runs once per process)."""
+        if self._migrated:
+            return
+        with self._lock:
+            if self._migrated:
+                return
+            conn = self._new_connection()
+            try:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS wishlist (
+                        mb_id TEXT PRIMARY KEY,
+                        artist TEXT,
+                        album TEXT,
+                        added_date REAL,
+                        auto_added BOOLEAN DEFAULT 0,
+                        release_date TEXT,
+                        release_year INTEGER,
+                        track_count INTEGER,
+                        download_status TEXT,
+                        download_started REAL,
+                        download_attempts INTEGER DEFAULT 0,
+                        next_attempt REAL
+                    )
+                ''')
+
+                conn.executescript('''
+                    CREATE TABLE IF NOT EXISTS download_jobs (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        mb_id TEXT NOT NULL,
+                        artist TEXT,
+                        title TEXT,
+                        state TEXT NOT NULL,
+                        query TEXT,
+                        candidates INTEGER DEFAULT 0,
+                        chosen_peer TEXT,
+                        chosen_files TEXT,
+                        message TEXT,
+                        created REAL,
+                        updated REAL,
+                        finished REAL,
+                        bytes_transferred INTEGER,
+                        bytes_total INTEGER,
+                        speed REAL,
+                        files_done INTEGER,
+                        progress_updated REAL
+                    );
+                    CREATE INDEX IF NOT EXISTS download_jobs_mb_id ON download_jobs (mb_id);
+                    CREATE INDEX IF NOT EXISTS download_jobs_updated ON download_jobs (updated);
+                ''')
+                for table, columns in (('wishlist', self.WISHLIST_COLUMNS), ('download_jobs', self.JOB_COLUMNS)):
+                    existing = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+                    for column, sql_type in columns.items():
+                        if column not in existing:
+                            print(f"Migrating {table} table: adding column {column}")
+                            conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {sql_type}')
+                
+                # slskd reuses local folder names, so a folder is claimed per job
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS imported_folders (
+                        path TEXT NOT NULL,
+                        job_id INTEGER NOT NULL,
+                        mb_id TEXT,
+                        status TEXT,
+                        imported REAL,
+                        output TEXT,
+                        attempts INTEGER DEFAULT 0,
+                        next_attempt REAL,
+                        PRIMARY KEY (path, job_id)
+                    )
+                ''')
+                
+                # Indexes on migrated columns can only be created once they exist
+                conn.executescript('''
+                    CREATE INDEX IF NOT EXISTS wishlist_added_date ON wishlist (added_date, mb_id);
+                    CREATE INDEX IF NOT EXISTS wishlist_download_status ON wishlist (download_status);
+                    CREATE INDEX IF NOT EXISTS wishlist_release_date ON wishlist (release_date);
+                ''')
+                
+                # Jobs that were queued or searching when the process stopped will
+                # never finish; downloads keep running in slskd and are left to the
+                # transfer tracker
+                active_states = ('queued', 'searching')
+                conn.execute(
+                    f"UPDATE download_jobs SET state = 'interrupted', finished = ? "
+                    f"WHERE state IN ({','.join('?' * len(active_states))})",
+                    (time.time(),) + active_states
+                )
+                conn.commit()
+            finally:
+                conn.close()
+            self._migrated = True
+            print(f"✓ Wishlist database ready: {self.db_path}")
+
+class JobStore:
+    """Persistent record of search/download jobs plus an in-memory change
+    feed that the SSE endpoint streams from."""
+
+    ACTIVE_STATES = ('queued', 'searching', 'downloading')
+    COLUMNS = ('id', 'mb_id', 'artist', 'title', 'state', 'query', 'candidates',
+               'chosen_peer', 'chosen_files', 'message', 'created', 'updated', 'finished',
+               'bytes_transferred', 'bytes_total', 'speed', 'files_done', 'progress_updated')
+
+    def __init__(self, db, history=500):
+        self.db = db
+        self._cond = threading.Condition()
+        self._events = deque(maxlen=history)
+        self._seq = 0
+
+    def _to_dict(self, row):
+        job = dict(row)
+        job['chosen_files'] = json.loads(job['chosen_files']) if job.get('chosen_files') else []
+        return job
+
+    def create(self, album_info):
+        """Record a new queued job and return its id."""
+        now = time.time()
+        with self.db.connection() as conn:
+            cursor = conn.execute('''
+                INSERT INTO download_jobs (mb_id, artist, title, state, created, updated)
+                VALUES (?, ?, ?, 'queued', ?, ?)
+            ''', (album_info['mb_id'], album_info.get('artist'), album_info.get('title'), now, now))
+            job_id = cursor.lastrowid
+        self._publish(self.get(job_id))
+        return job_id
+
+    def update(self, job_id, **fields):
+        """Update a job's fields and publish the change; errors are only logged."""
+        if job_id is None:
+            return
+        try:
+            now = time.time()
+            fields['updated'] = now
+            if fields.get('state') and fields['state'] not in self.ACTIVE_STATES:
+                fields.setdefault('finished', now)
+            if 'chosen_files' in fields:
+                fields['chosen_files'] = json.dumps(fields['chosen_files'])
+            columns = [c for c in fields if c in self.COLUMNS and c != 'id']
+
+            with self.db.connection() as conn:
+                conn.execute(
+                    f"UPDATE download_jobs SET {', '.join(f'{c} = ?' for c in columns)} WHERE id = ?",
+                    [fields[c] for c in columns] + [job_id]
+                )
+            self._publish(self.get(job_id))
+        except Exception as e:
+            print(f"Error updating job {job_id}: {e}")
+
+    def get(self, job_id):
+        with self.db.connection() as conn:
+            row = conn.execute('SELECT * FROM download_jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, limit=50, mb_id=None, active_only=False, state=None):
+        """Return the most recently updated jobs."""
+        where, params = [], []
+        if mb_id:
+            where.append('mb_id = ?')
+            params.append(mb_id)
+        if state:
+            where.append('state = ?')
+            params.append(state)
+        if active_only:
+            where.append(f"state IN ({','.join('?' * len(self.ACTIVE_STATES))})")
+            params.extend(self.ACTIVE_STATES)
+        sql = 'SELECT * FROM download_jobs'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY updated DESC LIMIT ?'
+        params.append(limit)
+
+        with self.db.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def _publish(self, job):
+        if not job:
+            return
+        with self._cond:
+            self._seq += 1
+            self._events.append((self._seq, job))
+            self._cond.notify_all()
+
+    def wait_for_events(self, since, timeout=15):
+        """Block until there are events newer than `since`; returns [(seq, job)]."""
+        with self._cond:
+            if since > self._seq:
+                since = 0  # Client is from before a restart
+            self._cond.wait_for(lambda: self._seq > since, timeout=timeout)
+            return [(seq, job) for seq, job in self._events if seq > since]
+
+class DownloadExecutor:
+    """Fixed-size worker pool for album search/download jobs.
+
+    Jobs are keyed by MusicBrainz release id: submitting an album that is
+    already queued or running is a no-op. When the queue is full new jobs
+    are rejected instead of piling up threads.
+    """
+
+    QUEUED = 'queued'
+    DUPLICATE = 'duplicate'
+    FULL = 'full'
+    SHUT_DOWN = 'shut_down'
+
+    def __init__(self, job_func, workers=2, queue_size=50, job_store=None):
+        self.job_func = job_func
+        self.workers = workers
+        self.job_store = job_store
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._running = set()
+        self._reserved = 0
+        self._threads = []
+        self._shutting_down = False
+
+    def submit(self, album_info):
+        """Queue a download job; returns QUEUED, DUPLICATE, FULL or SHUT_DOWN."""
+        mb_id = album_info['mb_id']
+        # Reserve the album and a queue slot, then record the job without
+        # holding the lock so status() and the workers don't wait on SQLite
+        with self._lock:
+            if self._shutting_down:
+                return self.SHUT_DOWN
+            if mb_id in self._in_flight:
+                return self.DUPLICATE
+            if 0 < self._queue.maxsize <= self._queue.qsize() + self._reserved:
+                return self.FULL
+            self._in_flight.add(mb_id)
+            self._reserved += 1
+
+        if self.job_store:
+            try:
+                album_info['job_id'] = self.job_store.create(album_info)
+            except Exception as e:
+                print(f"Could not record download job for {mb_id}: {e}")
+
+        with self._lock:
+            self._reserved -= 1
+            if self._shutting_down:
+                self._in_flight.discard(mb_id)
+            else:
+                self._queue.put_nowait(album_info)
+                self._ensure_workers()
+                return self.QUEUED
+        if self.job_store:
+            self.job_store.update(album_info.get('job_id'), state='cancelled', message='Server shut down')
+        return self.SHUT_DOWN
+
+    def _ensure_workers(self):
+        # Workers are started lazily so importing the app stays side-effect free
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker, name=f'download-worker-{len(self._threads)}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _worker(self):
+        while True:
+            album_info = self._queue.get()
+            if album_info is None:
+                self._queue.task_done()
+                return
+
+            mb_id = album_info['mb_id']
+            with self._lock:
+                self._running.add(mb_id)
+            try:
+                with profiler.profile('job', f'download-{mb_id}',
+                                      enabled=profiler.profile_all or album_info.get('profile', False)):
+                    self.job_func(album_info)
+            except Exception as e:
+                print(f"Download job for {mb_id} failed: {e}")
+                if self.job_store:
+                    self.job_store.update(album_info.get('job_id'), state='failed', message=str(e))
+            finally:
+                with self._lock:
+                    self._running.discard(mb_id)
+                    self._in_flight.discard(mb_id)
+                self._queue.task_done()
+
+    def is_in_flight(self, mb_id):
+        with self._lock:
+            return mb_id in self._in_flight
+
+    def status(self):
+        """Return queue depth and running job ids."""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queued': len(self._in_flight) - len(self._running),
+                'running': sorted(self._running)
+            }
+
+    def shutdown(self, timeout=10):
+        """Stop accepting jobs, drop queued ones and wait for running jobs."""
+        with self._lock:
+            if self._shutting_down:
+                return
+            self._shutting_down = True
+            threads = list(self._threads)
+
+        # Discard jobs that have not started yet
+        while True:
+            try:
+                album_info = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._in_flight.discard(album_info['mb_id'])
+            if self.job_store:
+                self.job_store.update(album_info.get('job_id'), state='cancelled', message='Server shut down')
+            self._queue.task_done()
+
+        for _ in threads:
+            self._queue.put(None)
+        deadline = time.time() + timeout
+        for thread in threads:
+            thread.join(max(deadline - time.time(), 0))
+
+class ReleaseScheduler:
+    """Queues downloads for wishlist albums once their release date passes.
+
+    Runs on its own `schedule` scheduler thread. Each check queues at most
+    `batch_size` albums and keeps the executor's queued plus running jobs
+    under `max_active`. Failed downloads are retried with exponential,
+    jittered backoff up to `max_attempts` times.
+    """
+
+    def __init__(self, db, executor, interval=15, batch_size=5, max_active=2,
+                 max_attempts=5, retry_backoff=3600, jitter=0.25):
+        self.db = db
+        self.executor = executor
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_active = max_active
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.jitter = jitter
+        self.scheduler = schedule.Scheduler()
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_run = None
+        self.queued_total = 0
+
+    def due_albums(self, limit):
+        """Released wishlist albums that have not been downloaded yet."""
+        now = time.time()
+        with self.db.connection() as conn:
+            rows = conn.execute(f'''
+                SELECT mb_id, artist, album, release_date, release_year, track_count,
+                       COALESCE(download_attempts, 0)
+                FROM wishlist
+                WHERE release_date <= ? AND {KNOWN_RELEASE_DATE}
+                  AND (download_status IS NULL OR download_status IN ('', 'failed'))
+                  AND COALESCE(download_attempts, 0) < ?
+                  AND (next_attempt IS NULL OR next_attempt <= ?)
+                ORDER BY COALESCE(download_attempts, 0), release_date DESC
+                LIMIT ?
+            ''', (datetime.now().strftime('%Y-%m-%d'), self.max_attempts, now, limit)).fetchall()
+        return rows
+
+    def retry_delay(self, attempts):
+        delay = self.retry_backoff * 2 ** max(attempts - 1, 0)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def run_once(self):
+        """Queue the next batch of due albums; returns how many were queued."""
+        self.last_run = time.time()
+        if not SLSKD_CONFIG['enabled'] or not slskd_client:
+            return 0
+
+        status = self.executor.status()
+        room = min(self.batch_size, self.max_active - status['queued'] - len(status['running']))
+        if room <= 0:
+            return 0
+
+        queued = 0
+        # Fetch a few extra in case some are already queued by hand
+        for row in self.due_albums(room * 2):
+            if queued >= room:
+                break
+            mb_id, artist, album, release_date, release_year, track_count, attempts = row
+            result = self.executor.submit({
+                'mb_id': mb_id,
+                'artist': artist,
+                'title': album,
+                'release_date': release_date,
+                'release_year': release_year,
+                'track_count': track_count or 0
+            })
+            if result == DownloadExecutor.DUPLICATE:
+                continue
+            if result != DownloadExecutor.QUEUED:
+                break
+
+            attempts += 1
+            with self.db.connection() as conn:
+                conn.execute(
+                    'UPDATE wishlist SET download_attempts = ?, next_attempt = ? WHERE mb_id = ?',
+                    (attempts, time.time() + self.retry_delay(attempts), mb_id)
+                )
+            print(f"Scheduler queued {artist} - {album} (released {release_date}, attempt {attempts})")
+            queued += 1
+
+        self.queued_total += queued
+        return queued
+
+    def _run_job(self):
+        try:
+            self.run_once()
+        except Exception as e:
+            print(f"Release scheduler check failed: {e}")
+
+    def _loop(self):
+        # First check after a short random delay so restarts don't all fire at once
+        if self._stop.wait(random.uniform(5, 30)):
+            return
+        self._run_job()
+        while not self._stop.wait(min(max(self.scheduler.idle_seconds or 60, 1), 60)):
+            self.scheduler.run_pending()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.scheduler.clear()
+        self.scheduler.every(self.interval).minutes.do(self._run_job)
+        self._thread = threading.Thread(target=self._loop, name='release-scheduler', daemon=True)
+        self._thread.start()
+        print(f"✓ Release scheduler running every {self.interval} minutes")
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        return {
+            'interval': self.interval,
+            'running': bool(self._thread and self._thread.is_alive()),
+            'last_run': self.last_run,
+            'next_run': self.scheduler.next_run.timestamp() if self.scheduler.jobs else None,
+            'queued_total': self.queued_total
+        }
+
+class DownloadTracker:
+    """Follows the slskd transfers of jobs in the 'downloading' state.
 
-def mark_album_downloading(mb_id):
-    """Mark an album as currently being downloaded."""
-    try:
-        if not beets_interface.wishlist_db_path:
+    Every cycle fetches all slskd downloads in one call, maps them back to
+    jobs by (username, filename) and records bytes, speed and completed
+    files. Finished jobs are marked completed. Jobs whose transfers errored
+    or made no progress for `stall_timeout` seconds are failed, their
+    transfers cancelled, and the album is queued again excluding the failed
+    peers so the next-best candidate gets a chance. Transfers slskd no
+    longer lists (cleared, or lost in a restart) count as done when their
+    file is where slskd saves it in the download directory.
+    """
+
+    SUCCEEDED = 'Completed, Succeeded'
+
+    def __init__(self, job_store, executor, interval=30, stall_timeout=1800, max_fallbacks=2,
+                 download_dir=None):
+        self.job_store = job_store
+        self.executor = executor
+        self.download_dir = download_dir
+        self.interval = interval
+        self.stall_timeout = stall_timeout
+        self.max_fallbacks = max_fallbacks
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_run = None
+        self.counters = {'completed': 0, 'failed': 0, 'stalled': 0, 'fallbacks': 0}
+
+    def run_once(self):
+        """Update every downloading job from a single slskd transfers call."""
+        self.last_run = time.time()
+        jobs = self.job_store.list(limit=1000, state='downloading')
+        if not jobs or not slskd_client:
             return
-        
-        conn = sqlite3.connect(beets_interface.wishlist_db_path)
-        cursor = conn.cursor()
-        
-        # Check if download_status column exists
-        cursor.execute("PRAGMA table_info(wishlist)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        if 'download_status' not in columns:
-            cursor.execute('ALTER TABLE wishlist ADD COLUMN download_status TEXT')
-            cursor.execute('ALTER TABLE wishlist ADD COLUMN download_started REAL')
-        
-        # Update status
-        cursor.execute('''
-            UPDATE wishlist 
-            SET download_status = "downloading", download_started = ?
-            WHERE mb_id = ?
-        ''', (time.time(), mb_id))
-        
-        conn.commit()
-        conn.close()
-        
-        print(f"Marked album as downloading: {mb_id}")
-        
-    except Exception as e:
-        print(f"Error marking album as downloading: {e}")
+
+        transfers = slskd_client.get_all_downloads()
+        if transfers is None:
+            return
+        by_file = {(t.get('username'), t.get('filename')): t for t in transfers}
+
+        now = time.time()
+        for job in jobs:
+            peer = job['chosen_peer']
+            files = [by_file.get((peer, filename)) for filename in job['chosen_files']]
+            found = [t for t in files if t]
+            missing = [filename for filename, t in zip(job['chosen_files'], files) if not t]
+
+            transferred = sum(t.get('bytesTransferred', 0) for t in found)
+            done = sum(1 for t in found if t.get('state') == self.SUCCEEDED)
+            if self.download_dir:
+                done += sum(1 for filename in missing
+                            if os.path.isfile(local_download_path(self.download_dir, filename)))
+            errored = [t for t in found if t.get('state', '').startswith('Completed') and t.get('state') != self.SUCCEEDED]
+            speed = sum(t.get('averageSpeed', 0) for t in found if t.get('state') == 'InProgress')
+
+            progressed = transferred > (job['bytes_transferred'] or 0) or done > (job['files_done'] or 0)
+            last_progress = now if progressed else (job['progress_updated'] or job['updated'])
+
+            if files and done == len(files):
+                self.job_store.update(job['id'], state='completed', bytes_transferred=transferred,
+                                      files_done=done, speed=0, progress_updated=now,
+                                      message=f"Downloaded {done} files from {peer}")
+                mark_album_downloaded(job['mb_id'])
+                self.counters['completed'] += 1
+                print(f"Download complete: {job['artist']} - {job['title']} from {peer}")
+            elif errored:
+                self.fail(job, found, f"{len(errored)} transfers failed ({errored[0].get('state')})")
+                self.counters['failed'] += 1
+            elif now - last_progress > self.stall_timeout:
+                self.fail(job, found, f"Stalled: no progress for {int(now - last_progress)}s")
+                self.counters['stalled'] += 1
+            elif progressed or speed != (job['speed'] or 0):
+                percent = transferred * 100 // job['bytes_total'] if job['bytes_total'] else 0
+                self.job_store.update(job['id'], bytes_transferred=transferred, files_done=done,
+                                      speed=speed, progress_updated=last_progress,
+                                      message=f"{done}/{len(files)} files, {percent}%")
+
+    def fail(self, job, transfers, reason):
+        """Fail a job, cancel its unfinished transfers and fall through to
+        the next-best peer when retries are left."""
+        print(f"Download failed for {job['artist']} - {job['title']} from {job['chosen_peer']}: {reason}")
+        for transfer in transfers:
+            if transfer.get('state') != self.SUCCEEDED and transfer.get('id'):
+                slskd_client.cancel_download(transfer['username'], transfer['id'])
+        self.job_store.update(job['id'], state='failed', speed=0, message=reason)
+        mark_album_download_failed(job['mb_id'])
+
+        failed_peers = sorted({
+            j['chosen_peer'] for j in self.job_store.list(limit=100, mb_id=job['mb_id'])
+            if j['state'] == 'failed' and j['chosen_peer']
+        })
+        if len(failed_peers) > self.max_fallbacks:
+            return
+
+        with self.job_store.db.connection() as conn:
+            row = conn.execute(
+                'SELECT artist, album, release_date, release_year, track_count FROM wishlist WHERE mb_id = ?',
+                (job['mb_id'],)
+            ).fetchone()
+        if not row:
+            return
+        artist, album, release_date, release_year, track_count = row
+        result = self.executor.submit({
+            'mb_id': job['mb_id'],
+            'artist': artist,
+            'title': album,
+            'release_date': release_date,
+            'release_year': release_year,
+            'track_count': track_count or 0,
+            'exclude_peers': failed_peers
+        })
+        if result == DownloadExecutor.QUEUED:
+            self.counters['fallbacks'] += 1
+            print(f"Retrying {artist} - {album} without peers: {', '.join(failed_peers)}")
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Download tracker cycle failed: {e}")
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='download-tracker', daemon=True)
+        self._thread.start()
+        print(f"✓ Download tracker polling slskd every {self.interval}s")
+
+    def stop(self):
+        self._stop.set()
+
+class DownloadImporter(FileSystemEventHandler):
+    """Imports finished album folders from the slskd download directory
+    into beets.
+
+    A top-level folder is considered once nothing in it changed for
+    `quiet_period` seconds. It is matched to the download job whose files
+    slskd saves there and, when that job has finished (or right away if
+    nothing tracks transfers), handed to a single import worker that runs
+    the beets importer in quiet mode. Afterwards the album is removed from
+    the wishlist. Every (folder, job) pair is claimed in the
+    imported_folders table first, so a job's download is never imported
+    twice while a later job landing in a same-named folder still is.
+    Failed imports are retried with exponential backoff up to
+    `max_attempts` times.
+    """
+
+    def __init__(self, db, job_store, download_dir, command, quiet_period=60,
+                 timeout=1800, require_completed=True, queue_size=100,
+                 max_attempts=3, retry_backoff=600):
+        super().__init__()
+        self.db = db
+        self.job_store = job_store
+        self.download_dir = os.path.abspath(download_dir)
+        self.command = shlex.split(command)
+        self.quiet_period = quiet_period
+        self.timeout = timeout
+        self.require_completed = require_completed
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.observer = None
+        self._lock = threading.Lock()
+        self._timers = {}
+        self._queued = set()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._worker = None
+        self.counters = {'imported': 0, 'failed': 0, 'ignored': 0}
+
+    def start(self):
+        """Watch the download directory, pick up existing folders and start the worker."""
+        if not os.path.isdir(self.download_dir):
+            print(f"⚠ Download directory not found, auto-import disabled: {self.download_dir}")
+            return
+        # Imports that were running when the process stopped never finished;
+        # the interrupted attempt doesn't count against the retry limit
+        with self.db.connection() as conn:
+            reset = conn.execute('''
+                UPDATE imported_folders
+                SET status = 'failed', next_attempt = ?, attempts = MAX(attempts - 1, 0)
+                WHERE status = 'importing'
+            ''', (time.time(),)).rowcount
+        if reset:
+            print(f"Retrying {reset} interrupted beets import(s)")
+        self._worker = threading.Thread(target=self._work, name='download-importer', daemon=True)
+        self._worker.start()
+        self.observer = Observer()
+        self.observer.daemon = True
+        self.observer.schedule(self, self.download_dir, recursive=True)
+        self.observer.start()
+        for entry in os.scandir(self.download_dir):
+            if entry.is_dir():
+                self.touch(entry.path)
+        print(f"✓ Auto-importing finished downloads from {self.download_dir}")
+
+    def stop(self):
+        if self.observer:
+            self.observer.stop()
+        with self._lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+        if self._worker:
+            self._queue.put(None)
+
+    def folder_for(self, path):
+        """Return the top-level album folder a path belongs to, or None."""
+        rel = os.path.relpath(os.path.abspath(path), self.download_dir)
+        if rel == '.' or rel.startswith('..'):
+            return None
+        return os.path.join(self.download_dir, rel.split(os.sep)[0])
+
+    def on_any_event(self, event):
+        if event.event_type in ('opened', 'closed_no_write'):
+            return
+        paths = [event.src_path]
+        if getattr(event, 'dest_path', None):
+            paths.append(event.dest_path)
+        for folder in {self.folder_for(path) for path in paths}:
+            if folder:
+                self.touch(folder)
+
+    def touch(self, folder, delay=None):
+        """(Re)start the quiet period of a folder, or wait `delay` seconds instead."""
+        with self._lock:
+            if folder in self._queued:
+                return
+            timer = self._timers.pop(folder, None)
+            if timer:
+                timer.cancel()
+            delay = self.quiet_period if delay is None else delay
+            timer = self._timers[folder] = threading.Timer(delay, self._quiet, [folder])
+            timer.daemon = True
+            timer.start()
+
+    def import_wait(self, folder, job):
+        """Seconds until `folder` may be imported for `job`: 0 if it can be now, None if never again."""
+        with self.db.connection() as conn:
+            row = conn.execute(
+                'SELECT status, attempts, next_attempt FROM imported_folders WHERE path = ? AND job_id = ?',
+                (folder, job['id'])
+            ).fetchone()
+        if row is None:
+            return 0
+        status, attempts, next_attempt = row
+        if status != 'failed' or attempts >= self.max_attempts:
+            return None
+        return max((next_attempt or 0) - time.time(), 0)
+
+    def retry_delay(self, attempts):
+        return self.retry_backoff * 2 ** max(attempts - 1, 0)
+
+    def find_job(self, folder):
+        """The most recent download job whose files slskd saves into `folder`."""
+        for job in self.job_store.list(limit=500):
+            if job['state'] in ('downloading', 'completed') and any(
+                os.path.dirname(local_download_path(self.download_dir, remote)) == folder
+                for remote in job['chosen_files']
+            ):
+                return job
+        return None
+
+    def _quiet(self, folder):
+        with self._lock:
+            self._timers.pop(folder, None)
+        try:
+            if not os.path.isdir(folder):
+                return
+            job = self.find_job(folder)
+            if not job:
+                print(f"Not importing {folder}: no matching download job")
+                self.counters['ignored'] += 1
+                return
+            wait = self.import_wait(folder, job)
+            if wait is None:
+                return
+            if wait > 0:
+                self.touch(folder, wait)
+                return
+            if self.require_completed and job['state'] != 'completed':
+                # Files are still arriving from slskd, check again later
+                self.touch(folder)
+                return
+            with self._lock:
+                if folder in self._queued:
+                    return
+                self._queue.put_nowait((folder, job))
+                self._queued.add(folder)
+        except queue.Full:
+            self.touch(folder)
+        except Exception as e:
+            print(f"Error checking download folder {folder}: {e}")
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            folder, job = item
+            success = False
+            try:
+                success = self.import_folder(folder, job)
+            except Exception as e:
+                print(f"Error importing {folder}: {e}")
+            finally:
+                with self._lock:
+                    self._queued.discard(folder)
+            if not success:
+                # Picked up again once its retry is due, if any are left
+                self.touch(folder)
+
+    def import_folder(self, folder, job):
+        """Run the beets importer on `folder`; returns True on success."""
+        # Claim the folder for this job first so nothing imports it a second
+        # time; failed imports can be claimed again once their retry is due
+        now = time.time()
+        with self.db.connection() as conn:
+            claimed = conn.execute('''
+                INSERT INTO imported_folders (path, job_id, mb_id, status, imported, attempts)
+                VALUES (?, ?, ?, 'importing', ?, 1)
+                ON CONFLICT (path, job_id) DO UPDATE SET
+                    status = 'importing', imported = excluded.imported, attempts = attempts + 1
+                WHERE status = 'failed' AND attempts < ? AND COALESCE(next_attempt, 0) <= ?
+            ''', (folder, job['id'], job['mb_id'], now, self.max_attempts, now)).rowcount
+            attempts = conn.execute(
+                'SELECT attempts FROM imported_folders WHERE path = ? AND job_id = ?', (folder, job['id'])
+            ).fetchone()[0]
+        if not claimed:
+            return False
+
+        print(f"Importing {folder} into beets ({job['artist']} - {job['title']})")
+        try:
+            result = subprocess.run(self.command + [folder], capture_output=True, text=True, timeout=self.timeout)
+            success = result.returncode == 0
+            output = (result.stdout + result.stderr)[-4000:]
+        except (OSError, subprocess.TimeoutExpired) as e:
+            success, output = False, str(e)
+
+        with self.db.connection() as conn:
+            conn.execute(
+                'UPDATE imported_folders SET status = ?, imported = ?, output = ?, next_attempt = ? '
+                'WHERE path = ? AND job_id = ?',
+                ('imported' if success else 'failed', time.time(), output,
+                 None if success else time.time() + self.retry_delay(attempts), folder, job['id'])
+            )
+            if success:
+                conn.execute('DELETE FROM wishlist WHERE mb_id = ?', (job['mb_id'],))
+
+        if success:
+            self.counters['imported'] += 1
+            self.job_store.update(job['id'], state='imported', message=f'Imported into beets from {os.path.basename(folder)}')
+            print(f"✓ Imported {job['artist']} - {job['title']}, removed from wishlist")
+        else:
+            self.counters['failed'] += 1
+            self.job_store.update(job['id'], message=f'beets import failed: {output.strip()[-200:]}')
+            print(f"✗ beets import failed for {folder} (attempt {attempts}/{self.max_attempts}): "
+                  f"{output.strip()[-500:]}")
+        return success
 
 # Initialize components
 beets_interface = BeetsInterface()
+musicbrainz = MusicBrainzGateway(
+    MUSICBRAINZ_CACHE_PATH,
+    min_interval=MUSICBRAINZ_CONFIG['min_interval'],
+    ttl=MUSICBRAINZ_CONFIG['cache_ttl'],
+    max_entries=MUSICBRAINZ_CONFIG['cache_size']
+)
+musicbrainz_search = MusicBrainzSearch(
+    musicbrainz,
+    ttl=MUSICBRAINZ_CONFIG['search_cache_ttl'],
+    max_entries=MUSICBRAINZ_CONFIG['search_cache_size']
+)
+library_stats = LibraryStatsCache(beets_interface)
+
+# Library change events; caches subscribe here instead of polling
+library_events = LibraryEvents()
+library_events.subscribe('library_db', lambda kind, paths: library_stats.invalidate())
+
+# Full-text search index over the library
+search_index = LibrarySearchIndex(SEARCH_INDEX_PATH, BEETS_DB_PATH)
+if beets_interface.lib:
+    library_events.subscribe('library_db', lambda kind, paths: search_index.request_sync())
+
+library_watcher = LibraryWatcher(
+    library_events,
+    BEETS_DB_PATH,
+    MUSIC_PATH,
+    ignore_paths=[beets_interface.wishlist_db_path],
+    debounce=WATCHER_CONFIG['debounce']
+)
 
 # Initialize slskd client if enabled
 slskd_client = None
 if SLSKD_CONFIG['enabled']:
     try:
-        slskd_client = SlskdClient(SLSKD_CONFIG['url'], SLSKD_CONFIG['api_key'])
+        slskd_client = SlskdClient(
+            SLSKD_CONFIG['url'], SLSKD_CONFIG['api_key'],
+            cache_ttl=SLSKD_CONFIG['search_cache_ttl'],
+            cache_size=SLSKD_CONFIG['search_cache_size'],
+            partial_ttl=SLSKD_CONFIG['search_cache_partial_ttl']
+        )
         print(f"slskd client initialized: {SLSKD_CONFIG['url']}")
     except Exception as e:
         print(f"Failed to initialize slskd client: {e}")
 
+# Bounded pool for search/download jobs, recorded in the job store
+wishlist_db = WishlistDB(beets_interface.wishlist_db_path)
+job_store = JobStore(wishlist_db)
+download_executor = DownloadExecutor(
+    search_and_download_album,
+    workers=DOWNLOAD_CONFIG['workers'],
+    queue_size=DOWNLOAD_CONFIG['queue_size'],
+    job_store=job_store
+)
+atexit.register(download_executor.shutdown)
+
+download_tracker = DownloadTracker(
+    job_store,
+    download_executor,
+    interval=TRACKER_CONFIG['interval'],
+    stall_timeout=TRACKER_CONFIG['stall_timeout'],
+    max_fallbacks=TRACKER_CONFIG['max_fallbacks'],
+    download_dir=SLSKD_CONFIG['download_dir']
+)
+
+download_importer = DownloadImporter(
+    wishlist_db,
+    job_store,
+    SLSKD_CONFIG['download_dir'],
+    IMPORT_CONFIG['command'],
+    quiet_period=IMPORT_CONFIG['quiet_period'],
+    timeout=IMPORT_CONFIG['timeout'],
+    require_completed=TRACKER_CONFIG['enabled'],
+    max_attempts=IMPORT_CONFIG['max_attempts'],
+    retry_backoff=IMPORT_CONFIG['retry_backoff']
+)
+
+release_scheduler = ReleaseScheduler(
+    wishlist_db,
+    download_executor,
+    interval=SCHEDULER_CONFIG['interval'],
+    batch_size=SCHEDULER_CONFIG['batch_size'],
+    max_active=SCHEDULER_CONFIG['max_active'],
+    max_attempts=SCHEDULER_CONFIG['max_attempts'],
+    retry_backoff=SCHEDULER_CONFIG['retry_backoff']
+)
+
+# Request latency for /metrics
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        metrics.observe(
+            'http_request_duration_seconds', time.perf_counter() - start,
+            route=request.url_rule.rule if request.url_rule else 'unmatched',
+            method=request.method, status=response.status_code
+        )
+    return response
+
+# Opt-in request profiling
+@app.before_request
+def start_request_profile():
+    if profiler.wants(request):
+        g.profile = profiler.start()
+        g.profile_start = time.perf_counter()
+
+@app.after_request
+def save_request_profile(response):
+    profile = g.pop('profile', None)
+    if profile:
+        name = f"{request.method}-{request.path}"
+        filename = profiler.save(profile, 'request', name, time.perf_counter() - g.pop('profile_start'))
+        if filename:
+            response.headers['X-Profile-File'] = filename
+    return response
+
+@app.route('/api/profiles')
+def api_profiles():
+    """List recent request and job profiles (admin only)."""
+    if not profiler.is_admin(request):
+        return jsonify({'error': 'Admin token required'}), 403
+    try:
+        limit = min(int(request.args.get('limit', 50)), 500)
+        return jsonify({'profiles': profiler.list(limit)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/profiles/<filename>')
+def api_profile(filename):
+    """Download a profile, or ?format=text for a cumulative-time report (admin only)."""
+    if not profiler.is_admin(request):
+        return jsonify({'error': 'Admin token required'}), 403
+    if filename not in profiler.files():
+        return jsonify({'error': 'Profile not found'}), 404
+    try:
+        if request.args.get('format') == 'text':
+            return Response(profiler.summary(filename), mimetype='text/plain')
+        return send_from_directory(profiler.directory, filename, as_attachment=True)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def cache_samples(name, counters):
+    hits, misses = counters.get('hits', 0), counters.get('misses', 0) + counters.get('expired', 0)
+    return [
+        ({'cache': name, 'result': 'hit'}, hits),
+        ({'cache': name, 'result': 'miss'}, misses)
+    ]
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus text exposition of latencies, queues, jobs and caches."""
+    gauges = []
+    try:
+        status = download_executor.status()
+        gauges.append(('download_queue_depth', 'gauge', 'Download jobs waiting for a worker',
+                       [({}, status['queued'])]))
+        gauges.append(('download_jobs_running', 'gauge', 'Download jobs being searched or started',
+                       [({}, len(status['running']))]))
+        
+        with wishlist_db.connection() as conn:
+            rows = conn.execute(
+                f"SELECT state, COUNT(*) FROM download_jobs "
+                f"WHERE state IN ({','.join('?' * len(JobStore.ACTIVE_STATES))}) GROUP BY state",
+                JobStore.ACTIVE_STATES
+            ).fetchall()
+        active = dict.fromkeys(JobStore.ACTIVE_STATES, 0)
+        active.update({state: count for state, count in rows})
+        gauges.append(('download_jobs_active', 'gauge', 'Active download jobs by state',
+                       [({'state': state}, count) for state, count in active.items()]))
+    except Exception as e:
+        print(f"Error collecting job metrics: {e}")
+    
+    caches = [
+        ('musicbrainz_release', musicbrainz.counters),
+        ('musicbrainz_search', musicbrainz_search.counters),
+        ('library_stats', library_stats.counters)
+    ]
+    if slskd_client:
+        caches.append(('slskd_search', slskd_client.cache_counters))
+    gauges.append(('cache_requests_total', 'counter', 'Cache lookups by cache and result',
+                   [sample for name, counters in caches for sample in cache_samples(name, counters)]))
+    
+    gauges.append(('download_tracker_events_total', 'counter', 'Download tracker outcomes',
+                   [({'event': event}, count) for event, count in download_tracker.counters.items()]))
+    gauges.append(('download_imports_total', 'counter', 'Auto-import outcomes',
+                   [({'result': result}, count) for result, count in download_importer.counters.items()]))
+    gauges.append(('scheduler_queued_total', 'counter', 'Albums queued by the release scheduler',
+                   [({}, release_scheduler.queued_total)]))
+    
+    return Response(metrics.render(gauges), mimetype='text/plain; version=0.0.4')
+
 # Routes
 @app.route('/')
 def index():
@@ -708,23 +3303,47 @@ def api_library():
         if not beets_interface.lib:
             return jsonify({'albums': [], 'total': 0, 'page': page, 'per_page': per_page})
         
-        # Get albums with optional search
-        if search:
-            albums = beets_interface.lib.albums(search)
-        else:
-            albums = beets_interface.lib.albums()
-        
-        albums_list = list(albums)
-        total = len(albums_list)
+        # Page in SQL when the query allows it, otherwise materialize everything
+        album_dirs = None
+        paged = None
         
-        # Pagination
-        start = (page - 1) * per_page
-        end = start + per_page
-        paginated_albums = albums_list[start:end]
+        # Plain-text searches go through the FTS index; anything using beets
+        # query syntax (fields, negation, sorts) keeps using beets' own parser
+        if search and search_index.ready and search_index.handles(search):
+            if search_index.is_stale():
+                search_index.request_sync()
+            
+            ranked = search_index.search(search, limit=per_page, offset=(page - 1) * per_page)
+            if ranked is not None:
+                album_ids, total = ranked
+                paginated_albums, album_dirs = beets_interface.albums_by_ids(album_ids)
+                paged = (paginated_albums, total, album_dirs)
+        
+        if paged is None:
+            paged = beets_interface.album_page(search, page, per_page)
+        if paged is not None:
+            paginated_albums, total, album_dirs = paged
+        else:
+            if search:
+                albums = beets_interface.lib.albums(search)
+            else:
+                albums = beets_interface.lib.albums()
+            
+            albums_list = list(albums)
+            total = len(albums_list)
+            
+            # Pagination
+            start = (page - 1) * per_page
+            end = start + per_page
+            paginated_albums = albums_list[start:end]
         
         # Convert to dict format
         albums_data = []
         for album in paginated_albums:
+            if album_dirs is not None:
+                path = album_dirs.get(album.id, b'')
+            else:
+                path = album.path
             albums_data.append({
                 'id': album.id,
                 'artist': album.albumartist or 'Unknown Artist',
@@ -732,7 +3351,7 @@ def api_library():
                 'year': album.year or '',
                 'mb_albumid': album.mb_albumid or '',
                 'mb_albumartistid': album.mb_albumartistid or '',
-                'path': album.path.decode() if hasattr(album.path, 'decode') else str(album.path)
+                'path': path.decode() if hasattr(path, 'decode') else str(path)
             })
         
         return jsonify({
@@ -753,29 +3372,7 @@ def api_library_stats():
         if not beets_interface.lib:
             return jsonify({'error': 'Library not available'}), 500
         
-        # Get basic stats
-        albums = list(beets_interface.lib.albums())
-        items = list(beets_interface.lib.items())
-        
-        # Calculate duration (keep this as it's from database, not filesystem)
-        total_duration = sum(item.length for item in items if item.length)
-        
-        # Remove filesize calculation entirely
-        # total_size = sum(item.filesize for item in items if item.filesize)
-        
-        # Get format breakdown
-        formats = {}
-        for item in items:
-            fmt = item.format or 'Unknown'
-            formats[fmt] = formats.get(fmt, 0) + 1
-        
-        return jsonify({
-            'albums': len(albums),
-            'tracks': len(items),
-            'duration': total_duration,
-            # 'size': total_size,  # Remove this line
-            'formats': formats
-        })
+        return jsonify(library_stats.get())
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -787,17 +3384,17 @@ def api_library_recent():
         if not beets_interface.lib:
             return jsonify({'albums': []})
         
-        # Get recent albums (last 20)
-        albums = beets_interface.lib.albums('added:-4w..')
+        # Get recent albums (last 20 added in the past 4 weeks)
+        since = (datetime.now() - timedelta(weeks=4)).timestamp()
         recent_albums = []
         
-        for album in sorted(albums, key=lambda a: a.added, reverse=True)[:20]:
+        for title, artist, year, added, tracks in beets_interface.recent_albums(since, limit=20):
             recent_albums.append({
-                'title': album.album,
-                'artist': album.albumartist,
-                'year': album.year,
-                'added': album.added.strftime('%Y-%m-%d') if album.added else None,
-                'tracks': len(list(album.items()))
+                'title': title,
+                'artist': artist,
+                'year': year,
+                'added': datetime.fromtimestamp(added).strftime('%Y-%m-%d') if added else None,
+                'tracks': tracks
             })
         
         return jsonify({'albums': recent_albums})
@@ -805,75 +3402,126 @@ def api_library_recent():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+WISHLIST_PAGE_SIZE = 100
+WISHLIST_MAX_PAGE_SIZE = 500
+
+# A YYYY, YYYY-MM or YYYY-MM-DD date compares as a string against today's
+# YYYY-MM-DD exactly like its first day would, so this stays index friendly
+KNOWN_RELEASE_DATE = "length(release_date) IN (4, 7, 10)"
+
+def encode_wishlist_cursor(added_date, mb_id):
+    return base64.urlsafe_b64encode(json.dumps([added_date, mb_id]).encode()).decode()
+
+def decode_wishlist_cursor(cursor):
+    added_date, mb_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return float(added_date), str(mb_id)
+
+def wishlist_filter_clause(args):
+    """Build the WHERE clause for the wishlist filters in the query string.
+
+    Supported filters: status (downloading, pending or a raw download_status),
+    release (released, upcoming, unknown), added (auto, manual) and q (text
+    matched against artist and album).
+    """
+    where, params = [], []
+    today = datetime.now().strftime('%Y-%m-%d')
+
+    status = args.get('status', 'all')
+    if status == 'pending':
+        where.append("(download_status IS NULL OR download_status != 'downloading')")
+    elif status != 'all':
+        where.append('download_status = ?')
+        params.append(status)
+
+    release = args.get('release', 'all')
+    if release == 'released':
+        where.append(f'release_date <= ? AND {KNOWN_RELEASE_DATE}')
+        params.append(today)
+    elif release == 'upcoming':
+        where.append(f'release_date > ? AND {KNOWN_RELEASE_DATE}')
+        params.append(today)
+    elif release == 'unknown':
+        where.append(f'(release_date IS NULL OR NOT {KNOWN_RELEASE_DATE})')
+
+    added = args.get('added', 'all')
+    if added == 'auto':
+        where.append('auto_added = 1')
+    elif added == 'manual':
+        where.append('(auto_added IS NULL OR auto_added = 0)')
+
+    text = args.get('q', '').strip()
+    if text:
+        pattern = '%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        where.append("(artist LIKE ? ESCAPE '\\' OR album LIKE ? ESCAPE '\\')")
+        params.extend([pattern, pattern])
+
+    return where, params, today
+
 @app.route('/api/wishlist')
 def api_wishlist():
-    """API endpoint for wishlist albums."""
+    """API endpoint for wishlist albums.
+    
+    Filtered server-side (see wishlist_filter_clause) and paginated newest
+    first with an opaque cursor; pass back next_cursor to get the next page.
+    """
     try:
         if not beets_interface.wishlist_db_path:
-            return jsonify({'albums': []})
-        
-        conn = sqlite3.connect(beets_interface.wishlist_db_path)
-        cursor = conn.cursor()
+            return jsonify({'albums': [], 'next_cursor': None, 'counts': {}})
         
-        # Check what columns exist
-        cursor.execute("PRAGMA table_info(wishlist)")
-        columns = [column[1] for column in cursor.fetchall()]
-        has_release_date = 'release_date' in columns
-        has_release_year = 'release_year' in columns
-        has_track_count = 'track_count' in columns
-        has_download_status = 'download_status' in columns
-        
-        if has_track_count and has_download_status:
-            cursor.execute('''
-                SELECT mb_id, artist, album, added_date, auto_added, release_date, release_year, track_count, download_status
-                FROM wishlist
-                ORDER BY added_date DESC
-            ''')
-        elif has_track_count:
-            cursor.execute('''
-                SELECT mb_id, artist, album, added_date, auto_added, release_date, release_year, track_count
-                FROM wishlist
-                ORDER BY added_date DESC
-            ''')
-        elif has_release_date:
-            cursor.execute('''
-                SELECT mb_id, artist, album, added_date, auto_added, release_date, release_year
-                FROM wishlist
-                ORDER BY added_date DESC
-            ''')
-        else:
-            cursor.execute('''
-                SELECT mb_id, artist, album, added_date, auto_added
-                FROM wishlist
-                ORDER BY added_date DESC
-            ''')
-        
-        rows = cursor.fetchall()
-        conn.close()
+        try:
+            limit = min(max(int(request.args.get('limit', WISHLIST_PAGE_SIZE)), 1), WISHLIST_MAX_PAGE_SIZE)
+            cursor = request.args.get('cursor')
+            after = decode_wishlist_cursor(cursor) if cursor else None
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid limit or cursor'}), 400
+        
+        where, params, today = wishlist_filter_clause(request.args)
+        filtered = ' WHERE ' + ' AND '.join(where) if where else ''
+        
+        page_where, page_params = list(where), list(params)
+        if after:
+            page_where.append('(added_date < ? OR (added_date = ? AND mb_id < ?))')
+            page_params.extend([after[0], after[0], after[1]])
+        page_filter = ' WHERE ' + ' AND '.join(page_where) if page_where else ''
+        
+        with wishlist_db.connection() as conn:
+            rows = conn.execute(f'''
+                SELECT mb_id, artist, album, added_date,
+                       strftime('%Y-%m-%d %H:%M:%S', added_date, 'unixepoch', 'localtime'),
+                       auto_added, release_date, release_year, track_count, download_status
+                FROM wishlist{page_filter}
+                ORDER BY added_date DESC, mb_id DESC
+                LIMIT ?
+            ''', page_params + [limit + 1]).fetchall()
+            
+            counts = conn.execute(f'''
+                SELECT COUNT(*),
+                       SUM(release_date <= ? AND {KNOWN_RELEASE_DATE}),
+                       SUM(release_date > ? AND {KNOWN_RELEASE_DATE}),
+                       SUM(release_date IS NULL OR NOT {KNOWN_RELEASE_DATE}),
+                       SUM(auto_added = 1)
+                FROM wishlist{filtered}
+            ''', [today, today] + params).fetchone()
+            by_status = conn.execute(f'''
+                SELECT COALESCE(download_status, 'pending'), COUNT(*)
+                FROM wishlist{filtered}
+                GROUP BY 1
+            ''', params).fetchall()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_wishlist_cursor(rows[-1][3], rows[-1][0])
         
         albums = []
         for row in rows:
-            if has_track_count and has_download_status:
-                mb_id, artist, album, added_date, auto_added, release_date, release_year, track_count, download_status = row
-            elif has_track_count:
-                mb_id, artist, album, added_date, auto_added, release_date, release_year, track_count = row
-                download_status = None
-            elif has_release_date:
-                mb_id, artist, album, added_date, auto_added, release_date, release_year = row
-                track_count = None
-                download_status = None
-            else:
-                mb_id, artist, album, added_date, auto_added = row
-                release_date = None
-                release_year = None
-                track_count = None
-                download_status = None
+            mb_id, artist, album, _, added_date, auto_added, release_date, release_year, track_count, download_status = row
             
             albums.append({
                 'mb_id': mb_id,
                 'artist': artist,
                 'title': album,
-                'added_date': datetime.fromtimestamp(added_date).strftime('%Y-%m-%d %H:%M:%S'),
+                'added_date': added_date,
                 'auto_added': bool(auto_added),
                 'release_date': release_date,
                 'release_year': release_year,
@@ -882,7 +3530,19 @@ def api_wishlist():
                 'musicbrainz_url': f'https://musicbrainz.org/release/{mb_id}'
             })
         
-        return jsonify({'albums': albums})
+        total, released, upcoming, unknown, auto_added = counts
+        return jsonify({
+            'albums': albums,
+            'next_cursor': next_cursor,
+            'counts': {
+                'total': total,
+                'released': released or 0,
+                'upcoming': upcoming or 0,
+                'unknown': unknown or 0,
+                'auto_added': auto_added or 0,
+                'status': {status: count for status, count in by_status}
+            }
+        })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -903,15 +3563,9 @@ def api_wishlist_add():
         # Get track count from MusicBrainz
         track_count = 0
         try:
-            release_info = musicbrainzngs.get_release_by_id(mb_id, includes=['recordings'])
+            release_info = musicbrainz.get_release(mb_id, includes=['recordings'])
             release = release_info['release']
-            
-            if 'medium-list' in release:
-                for medium in release['medium-list']:
-                    if 'track-count' in medium:
-                        track_count += int(medium['track-count'])
-                    elif 'track-list' in medium:
-                        track_count += len(medium['track-list'])
+            track_count = count_release_tracks(release)
                         
             # If no release date provided, get it too
             if not release_date:
@@ -921,34 +3575,10 @@ def api_wishlist_add():
             print(f"Could not get track count from MusicBrainz: {e}")
         
         # Parse release year from date
-        release_year = None
-        if release_date:
-            try:
-                if len(release_date) >= 4:
-                    release_year = int(release_date[:4])
-            except ValueError:
-                pass
+        release_year = parse_release_year(release_date)
         
         # Check if album is already released
-        is_released = False
-        if release_date:
-            try:
-                from datetime import datetime
-                # Parse release date (handle different formats)
-                release_datetime = None
-                
-                if len(release_date) == 10:  # YYYY-MM-DD
-                    release_datetime = datetime.strptime(release_date, '%Y-%m-%d')
-                elif len(release_date) == 7:  # YYYY-MM
-                    release_datetime = datetime.strptime(release_date + '-01', '%Y-%m-%d')
-                elif len(release_date) == 4:  # YYYY
-                    release_datetime = datetime.strptime(release_date + '-01-01', '%Y-%m-%d')
-                
-                if release_datetime:
-                    is_released = release_datetime.date() <= datetime.now().date()
-                    
-            except ValueError as e:
-                print(f"Could not parse release date {release_date}: {e}")
+        is_released = is_date_released(release_date)
         
         print(f"Album release info: date={release_date}, is_released={is_released}")
         
@@ -969,35 +3599,15 @@ def api_wishlist_add():
                 pass
         
         # Add to wishlist
-        conn = sqlite3.connect(beets_interface.wishlist_db_path)
-        cursor = conn.cursor()
-        
-        # Check if already in wishlist
-        cursor.execute('SELECT COUNT(*) FROM wishlist WHERE mb_id = ?', (mb_id,))
-        if cursor.fetchone()[0] > 0:
-            conn.close()
-            return jsonify({'error': 'Album already in wishlist'}), 400
-        
-        # Check what columns exist
-        cursor.execute("PRAGMA table_info(wishlist)")
-        columns = [column[1] for column in cursor.fetchall()]
-        has_track_count = 'track_count' in columns
-        
-        if has_track_count:
-            # Insert with track count
-            cursor.execute('''
+        with wishlist_db.connection() as conn:
+            # Check if already in wishlist
+            if conn.execute('SELECT 1 FROM wishlist WHERE mb_id = ?', (mb_id,)).fetchone():
+                return jsonify({'error': 'Album already in wishlist'}), 400
+            
+            conn.execute('''
                 INSERT INTO wishlist (mb_id, artist, album, added_date, auto_added, release_date, release_year, track_count)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             ''', (mb_id, artist, title, time.time(), False, release_date, release_year, track_count))
-        else:
-            # Insert without track count (backward compatibility)
-            cursor.execute('''
-                INSERT INTO wishlist (mb_id, artist, album, added_date, auto_added, release_date, release_year)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (mb_id, artist, title, time.time(), False, release_date, release_year))
-        
-        conn.commit()
-        conn.close()
         
         # Auto-download if album is already released and slskd is enabled
         download_triggered = False
@@ -1013,17 +3623,17 @@ def api_wishlist_add():
                 'track_count': track_count
             }
             
-            # Start download in background thread
-            thread = threading.Thread(
-                target=search_and_download_album,
-                args=(album_info,)
-            )
-            thread.start()
-            download_triggered = True
+            # Hand the download to the worker pool
+            submit_status = download_executor.submit(album_info)
+            download_triggered = submit_status in (DownloadExecutor.QUEUED, DownloadExecutor.DUPLICATE)
+            if submit_status == DownloadExecutor.FULL:
+                print("Download queue is full, not starting auto-download")
         
         response_message = f'Added {artist} - {title} to wishlist'
         if download_triggered:
             response_message += ' and started download (album is already released)'
+        elif is_released and SLSKD_CONFIG['enabled'] and slskd_client:
+            response_message += ' (download queue is full, try downloading later)'
         
         return jsonify({
             'success': True, 
@@ -1045,6 +3655,173 @@ def api_wishlist_add():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+MBID_RE = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$')
+
+def parse_wishlist_import(req):
+    """Read import entries from JSON (a list of MBIDs or album objects) or CSV.
+
+    CSV may be the request body or an uploaded 'file'; with a header row the
+    columns mb_id, artist, title and release_date are used, without one the
+    first column is taken as the MBID.
+    """
+    upload = req.files.get('file')
+    if upload:
+        text = upload.read().decode('utf-8-sig')
+    elif req.is_json:
+        data = req.get_json()
+        if isinstance(data, dict):
+            data = data.get('albums') or data.get('mb_ids') or []
+        if not isinstance(data, list):
+            data = [data]
+        # Anything but an album object is taken as a bare MBID and validated later
+        return [dict(entry) if isinstance(entry, dict) else {'mb_id': entry} for entry in data]
+    else:
+        text = req.get_data(as_text=True)
+
+    rows = [row for row in csv.reader(io.StringIO(text)) if row and any(cell.strip() for cell in row)]
+    if not rows:
+        return []
+
+    header = [cell.strip().lower() for cell in rows[0]]
+    if 'mb_id' in header:
+        return [dict(zip(header, (cell.strip() for cell in row))) for row in rows[1:]]
+    return [{'mb_id': row[0].strip()} for row in rows]
+
+def import_wishlist_entries(entries):
+    """Import entries into the wishlist, yielding one result dict per entry.
+
+    Library and wishlist duplicates are checked in bulk, metadata comes from
+    batched MusicBrainz lookups and all rows are inserted in one transaction.
+    """
+    counts = {}
+
+    def result(entry, status, message=''):
+        counts[status] = counts.get(status, 0) + 1
+        return {'mb_id': entry.get('mb_id'), 'status': status, 'message': message}
+
+    # Validate and drop repeated ids
+    pending = {}
+    for entry in entries:
+        # JSON may carry numbers or lists where strings are expected
+        for field in ('mb_id', 'artist', 'title', 'album', 'release_date'):
+            if entry.get(field) is not None and not isinstance(entry[field], str):
+                entry[field] = str(entry[field])
+        mb_id = (entry.get('mb_id') or '').strip().lower()
+        entry['mb_id'] = mb_id
+        track_count = str(entry.get('track_count') or 0).strip()
+        if not MBID_RE.match(mb_id):
+            yield result(entry, 'invalid', 'Not a MusicBrainz release id')
+        elif mb_id in pending:
+            yield result(entry, 'duplicate_input', 'Listed more than once')
+        elif not track_count.isdigit():
+            yield result(entry, 'invalid', 'track_count is not a number')
+        else:
+            entry['track_count'] = int(track_count)
+            pending[mb_id] = entry
+
+    # Already on the wishlist
+    ids = list(pending)
+    existing = []
+    with wishlist_db.connection() as conn:
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            existing.extend(row[0] for row in conn.execute(
+                f"SELECT mb_id FROM wishlist WHERE mb_id IN ({','.join('?' * len(chunk))})", chunk
+            ))
+    for mb_id in existing:
+        yield result(pending.pop(mb_id), 'duplicate_wishlist', 'Album already in wishlist')
+
+    # Already in the library, by MusicBrainz id and by name
+    library_names = set()
+    in_library = []
+    if beets_interface.lib and pending:
+        ids = list(pending)
+        # Only read inside the transaction; results are yielded after it so
+        # a slow client doesn't hold beets' database lock
+        with beets_interface.lib.transaction() as tx:
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                in_library.extend(row[0] for row in tx.query(
+                    f"SELECT DISTINCT mb_albumid FROM albums WHERE mb_albumid IN ({','.join('?' * len(chunk))})", chunk
+                ))
+            library_names = {
+                ((artist or '').lower(), (album or '').lower())
+                for artist, album in tx.query('SELECT albumartist, album FROM albums')
+            }
+    for mb_id in in_library:
+        yield result(pending.pop(mb_id), 'duplicate_library', 'Album already in library')
+
+    # Resolve metadata in batches for entries that need it
+    to_lookup = [mb_id for mb_id, entry in pending.items()
+                 if not (entry.get('artist') and (entry.get('title') or entry.get('album'))
+                         and entry.get('track_count'))]
+    releases = musicbrainz.lookup_releases(to_lookup) if to_lookup else {}
+
+    rows = []
+    for mb_id, entry in list(pending.items()):
+        release = releases.get(mb_id)
+        if mb_id in to_lookup and not release:
+            yield result(entry, 'not_found', 'Release not found on MusicBrainz')
+            continue
+
+        artist = entry.get('artist')
+        title = entry.get('title') or entry.get('album')
+        release_date = entry.get('release_date') or ''
+        track_count = entry['track_count']
+        if release:
+            artist = artist or release.get('artist-credit', [{}])[0].get('name', 'Unknown Artist')
+            title = title or release.get('title', 'Unknown Title')
+            release_date = release_date or release.get('date', '')
+            track_count = track_count or count_release_tracks(release)
+
+        if (artist.lower(), title.lower()) in library_names:
+            yield result(entry, 'duplicate_library', 'Album already in library (by name)')
+            continue
+
+        entry.update(artist=artist, title=title)
+        rows.append((mb_id, artist, title, time.time(), False, release_date,
+                     parse_release_year(release_date), track_count))
+
+    # Write everything in a single transaction
+    with wishlist_db.connection() as conn:
+        conn.executemany('''
+            INSERT INTO wishlist (mb_id, artist, album, added_date, auto_added, release_date, release_year, track_count)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+
+    for row in rows:
+        yield result(pending[row[0]], 'added', f'Added {row[1]} - {row[2]} to wishlist')
+
+    yield {'summary': counts}
+
+@app.route('/api/wishlist/import', methods=['POST'])
+def api_wishlist_import():
+    """Bulk-add albums to the wishlist from a list of MBIDs or a CSV.
+
+    Streams one JSON line per entry, followed by a summary line.
+    Downloads are not started for imported albums.
+    """
+    try:
+        if not beets_interface.wishlist_db_path:
+            return jsonify({'error': 'Wishlist not available'}), 500
+        
+        entries = parse_wishlist_import(request)
+        if not entries:
+            return jsonify({'error': 'No albums to import'}), 400
+        
+        def generate():
+            try:
+                for item in import_wishlist_entries(entries):
+                    yield json.dumps(item) + '\n'
+            except Exception as e:
+                print(f"Error importing wishlist: {e}")
+                yield json.dumps({'error': str(e)}) + '\n'
+        
+        return Response(generate(), mimetype='application/x-ndjson')
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/wishlist/remove/<mb_id>', methods=['DELETE'])
 def api_wishlist_remove(mb_id):
     """Remove album from wishlist."""
@@ -1052,17 +3829,12 @@ def api_wishlist_remove(mb_id):
         if not beets_interface.wishlist_db_path:
             return jsonify({'error': 'Wishlist not available'}), 500
         
-        conn = sqlite3.connect(beets_interface.wishlist_db_path)
-        cursor = conn.cursor()
+        with wishlist_db.connection() as conn:
+            deleted = conn.execute('DELETE FROM wishlist WHERE mb_id = ?', (mb_id,)).rowcount
         
-        cursor.execute('DELETE FROM wishlist WHERE mb_id = ?', (mb_id,))
-        
-        if cursor.rowcount > 0:
-            conn.commit()
-            conn.close()
+        if deleted > 0:
             return jsonify({'success': True, 'message': 'Album removed from wishlist'})
         else:
-            conn.close()
             return jsonify({'error': 'Album not found in wishlist'}), 404
             
     except Exception as e:
@@ -1081,43 +3853,17 @@ def api_download_album(mb_id):
         print("Getting album info from wishlist database...")
         
         # Get album info from wishlist - include track_count
-        conn = sqlite3.connect(beets_interface.wishlist_db_path)
-        cursor = conn.cursor()
-        
-        # Check what columns exist
-        cursor.execute("PRAGMA table_info(wishlist)")
-        columns = [column[1] for column in cursor.fetchall()]
-        has_track_count = 'track_count' in columns
-        
-        if has_track_count:
-            cursor.execute('''
+        with wishlist_db.connection() as conn:
+            result = conn.execute('''
                 SELECT mb_id, artist, album, release_date, release_year, track_count
                 FROM wishlist
                 WHERE mb_id = ?
-            ''', (mb_id,))
-            
-            result = cursor.fetchone()
-            if result:
-                mb_id, artist, album, release_date, release_year, track_count = result
-            else:
-                conn.close()
-                return jsonify({'error': 'Album not found in wishlist'}), 404
-        else:
-            cursor.execute('''
-                SELECT mb_id, artist, album, release_date, release_year
-                FROM wishlist
-                WHERE mb_id = ?
-            ''', (mb_id,))
-            
-            result = cursor.fetchone()
-            if result:
-                mb_id, artist, album, release_date, release_year = result
-                track_count = 0
-            else:
-                conn.close()
-                return jsonify({'error': 'Album not found in wishlist'}), 404
+            ''', (mb_id,)).fetchone()
         
-        conn.close()
+        if not result:
+            return jsonify({'error': 'Album not found in wishlist'}), 404
+        mb_id, artist, album, release_date, release_year, track_count = result
+        track_count = track_count or 0
         
         print(f"Found album: {artist} - {album} (expected tracks: {track_count})")
         
@@ -1127,19 +3873,23 @@ def api_download_album(mb_id):
             'title': album,
             'release_date': release_date,
             'release_year': release_year,
-            'track_count': track_count  # Make sure to include this!
+            'track_count': track_count,  # Make sure to include this!
+            'profile': profiler.wants(request)
         }
         
-        print("Starting download thread...")
+        print("Queueing download job...")
         
-        # Start download in background thread
-        thread = threading.Thread(
-            target=search_and_download_album,
-            args=(album_info,)
-        )
-        thread.start()
+        # Hand the download to the worker pool
+        submit_status = download_executor.submit(album_info)
+        
+        if submit_status == DownloadExecutor.DUPLICATE:
+            return jsonify({'error': f'Download already in progress for {artist} - {album}'}), 409
+        if submit_status == DownloadExecutor.FULL:
+            return jsonify({'error': 'Download queue is full, try again later'}), 503
+        if submit_status == DownloadExecutor.SHUT_DOWN:
+            return jsonify({'error': 'Server is shutting down'}), 503
         
-        print("Download thread started successfully")
+        print("Download job queued successfully")
         
         return jsonify({
             'success': True,
@@ -1160,36 +3910,111 @@ def api_musicbrainz_search():
         if not query:
             return jsonify({'releases': []})
         
-        # Search MusicBrainz
-        result = musicbrainzngs.search_releases(
-            query=query,
-            limit=10,
-            type='album'
-        )
-        
-        releases = []
-        for release in result.get('release-list', []):
-            artist = release.get('artist-credit', [{}])[0].get('name', 'Unknown Artist')
-            
-            releases.append({
-                'id': release['id'],
-                'title': release.get('title', 'Unknown Title'),
-                'artist': artist,
-                'date': release.get('date', ''),
-                'country': release.get('country', ''),
-                'status': release.get('status', ''),
-                'score': release.get('score', 0)
-            })
+        # Identical queries are coalesced and cached; a query superseded by a
+        # newer one from the same client is dropped before it hits MusicBrainz
+        client_id = request.args.get('client') or request.remote_addr
+        try:
+            releases = musicbrainz_search.search(query, client_id=client_id)
+        except RequestSuperseded:
+            return jsonify({'releases': [], 'superseded': True})
         
         return jsonify({'releases': releases})
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/musicbrainz/stats')
+def api_musicbrainz_stats():
+    """MusicBrainz gateway call and cache counters."""
+    try:
+        stats = musicbrainz.stats()
+        stats['search'] = musicbrainz_search.stats()
+        return jsonify(stats)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs')
+def api_jobs():
+    """List recent search/download jobs."""
+    try:
+        limit = min(int(request.args.get('limit', 50)), 500)
+        mb_id = request.args.get('mb_id')
+        active_only = request.args.get('active', '').lower() in ('1', 'true')
+        
+        return jsonify({
+            'jobs': job_store.list(limit=limit, mb_id=mb_id, active_only=active_only),
+            'executor': download_executor.status()
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<int:job_id>')
+def api_job(job_id):
+    """Get a single job."""
+    try:
+        job = job_store.get(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify({'job': job})
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/stream')
+def api_jobs_stream():
+    """Server-Sent Events stream of job changes."""
+    since = request.headers.get('Last-Event-ID') or request.args.get('since') or 0
+    try:
+        since = int(since)
+    except ValueError:
+        since = 0
+    
+    def generate(since):
+        yield 'retry: 3000\n\n'
+        while True:
+            events = job_store.wait_for_events(since, timeout=15)
+            if not events:
+                yield ': keep-alive\n\n'
+                continue
+            for seq, job in events:
+                since = seq
+                yield f"id: {seq}\nevent: job\ndata: {json.dumps(job)}\n\n"
+    
+    return Response(
+        stream_with_context(generate(since)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 if __name__ == '__main__':
     print("Starting beets-frontend...")
     print(f"Beets library: {'Available' if beets_interface.lib else 'Not available'}")
     print(f"Wishlist database: {beets_interface.wishlist_db_path}")
     print(f"slskd integration: {'Enabled' if SLSKD_CONFIG['enabled'] else 'Disabled'}")
     
+    if beets_interface.wishlist_db_path:
+        try:
+            wishlist_db.migrate()
+        except Exception as e:
+            print(f"Failed to migrate wishlist database: {e}")
+    
+    if beets_interface.lib:
+        search_index.request_sync()
+    
+    if SCHEDULER_CONFIG['enabled'] and SLSKD_CONFIG['enabled']:
+        release_scheduler.start()
+    
+    if TRACKER_CONFIG['enabled'] and SLSKD_CONFIG['enabled']:
+        download_tracker.start()
+    
+    if IMPORT_CONFIG['enabled'] and SLSKD_CONFIG['enabled'] and beets_interface.wishlist_db_path:
+        download_importer.start()
+    
+    if WATCHER_CONFIG['enabled']:
+        try:
+            library_watcher.start()
+        except Exception as e:
+            print(f"Failed to start library watcher: {e}")
+    
     app.run(host='0.0.0.0', port=5000, debug=False)
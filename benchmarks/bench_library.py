@@ -0,0 +1,252 @@
+"""Benchmark the library and wishlist routes against synthetic beets libraries.
+
+Generates beets library.db files of the requested sizes (about 12 items per
+album), plus a wishlist, and times the JSON routes through Flask's test
+client. Results are written as JSON so runs can be compared over time.
+
+    python benchmarks/bench_library.py --sizes 1000,50000,250000
+    python benchmarks/bench_library.py --sizes 1000 --repeat 20 --output run.json
+
+Generated databases are kept in --data-dir and reused by later runs.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+    from beets import library
+
+FORMATS = ['MP3', 'MP3', 'MP3', 'FLAC', 'AAC', 'OGG']
+GENRES = ['Rock', 'Jazz', 'Electronic', 'Hip-Hop', 'Classical', 'Folk', 'Metal', 'Pop']
+WORDS = ['Blue', 'Night', 'River', 'Echo', 'Glass', 'Summer', 'Ghost', 'Paper', 'Signal',
+         'Velvet', 'Northern', 'Static', 'Golden', 'Hollow', 'Electric', 'Silent']
+
+
+def generate_library(path, albums, tracks_per_album=12, seed=0):
+    """Write a beets library with `albums` albums straight through SQLite."""
+    rng = random.Random(seed)
+    # Let beets create the schema, then bulk insert rows
+    library.Library(path)._connection().close()
+    now = time.time()
+    artists = max(albums // 8, 1)
+
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA synchronous=OFF')
+    conn.execute('PRAGMA journal_mode=MEMORY')
+
+    def album_rows():
+        for album_id in range(1, albums + 1):
+            artist = f'{rng.choice(WORDS)} {rng.choice(WORDS)} {album_id % artists}'
+            title = f'{rng.choice(WORDS)} {rng.choice(WORDS)} {album_id}'
+            year = 1960 + album_id % 64
+            added = now - album_id * 600  # Newest first, a few weeks inside the "recent" window
+            yield (album_id, artist, title, year, rng.choice(GENRES), f'mbid-{album_id:08d}',
+                   f'artist-{album_id % artists:06d}', added)
+
+    conn.executemany('''
+        INSERT INTO albums (id, albumartist, album, year, genre, mb_albumid, mb_albumartistid, added)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', album_rows())
+
+    def item_rows():
+        for album_id, artist, title, year, added in conn.execute(
+            'SELECT id, albumartist, album, year, added FROM albums ORDER BY id'
+        ).fetchall():
+            fmt = rng.choice(FORMATS)
+            for track in range(1, tracks_per_album + 1):
+                path = f'/music/{artist}/{title}/{track:02d} Track {track}.{fmt.lower()}'.encode()
+                yield (album_id, f'{rng.choice(WORDS)} Track {track}', artist, artist, title, track,
+                       tracks_per_album, year, rng.uniform(120, 420), fmt, 320000, path,
+                       f'mbid-{album_id:08d}', added, added)
+
+    conn.executemany('''
+        INSERT INTO items (album_id, title, artist, albumartist, album, track, tracktotal, year,
+                           length, format, bitrate, path, mb_albumid, added, mtime)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', item_rows())
+    conn.commit()
+    conn.close()
+
+
+def generate_wishlist(db, entries, seed=0):
+    rng = random.Random(seed)
+    now = time.time()
+    with db.connection() as conn:
+        conn.execute('DELETE FROM wishlist')
+        conn.executemany('''
+            INSERT INTO wishlist (mb_id, artist, album, added_date, auto_added, release_date,
+                                  release_year, track_count, download_status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (f'wish-{i:08d}', f'{rng.choice(WORDS)} {rng.choice(WORDS)}', f'{rng.choice(WORDS)} {i}',
+             now - i * 60, rng.random() < 0.6, rng.choice(['2019-05-01', '2023', '2099-01-01', None]),
+             None, 12, rng.choice([None, None, 'downloading', 'failed']))
+            for i in range(entries)
+        ])
+
+
+def prepare(data_dir, albums, wishlist_entries):
+    """Point the app at a (generated or cached) library of `albums` albums."""
+    lib_path = os.path.join(data_dir, f'library-{albums}.db')
+    generated = None
+    if not os.path.exists(lib_path):
+        start = time.perf_counter()
+        generate_library(lib_path + '.tmp', albums)
+        os.replace(lib_path + '.tmp', lib_path)
+        generated = time.perf_counter() - start
+
+    app.beets_interface.lib = library.Library(lib_path)
+    app.library_stats = app.LibraryStatsCache(app.beets_interface)
+
+    index_path = os.path.join(data_dir, f'search-{albums}.db')
+    app.search_index = app.LibrarySearchIndex(index_path, lib_path)
+    app.search_index.open()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.search_index.sync()
+    index_sync = time.perf_counter() - start
+
+    wishlist_path = os.path.join(data_dir, 'wishlist.db')
+    app.beets_interface.wishlist_db_path = wishlist_path
+    app.wishlist_db = app.WishlistDB(wishlist_path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.wishlist_db.migrate()
+    generate_wishlist(app.wishlist_db, wishlist_entries)
+
+    return {'library_generate_s': generated, 'search_index_sync_s': index_sync}
+
+
+def time_route(client, url, repeat, before=None):
+    """Request `url` `repeat` times and summarize the latencies."""
+    timings = []
+    status = size = None
+    if before is None:
+        client.get(url)  # Warm-up, so caches and connections are not counted
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        response = client.get(url)
+        data = response.get_data()
+        timings.append(time.perf_counter() - start)
+        status, size = response.status_code, len(data)
+    timings.sort()
+    return {
+        'url': url,
+        'status': status,
+        'bytes': size,
+        'runs': repeat,
+        'min_ms': round(timings[0] * 1000, 3),
+        'median_ms': round(statistics.median(timings) * 1000, 3),
+        'p95_ms': round(timings[min(int(len(timings) * 0.95), len(timings) - 1)] * 1000, 3),
+        'max_ms': round(timings[-1] * 1000, 3)
+    }
+
+
+def run_cases(client, albums, repeat, per_page):
+    last_page = max((albums + per_page - 1) // per_page, 1)
+    wishlist = client.get('/api/wishlist?limit=100').get_json()
+    cursor = wishlist.get('next_cursor')
+    for _ in range(9):  # Walk to the 10th page for a deep cursor
+        if not cursor:
+            break
+        cursor = client.get(f'/api/wishlist?limit=100&cursor={cursor}').get_json().get('next_cursor')
+    # Last page of a broad search, so the deep case always returns results
+    search_total = client.get(f'/api/library?search=velvet&per_page={per_page}').get_json().get('total', 0)
+    search_last_page = max((search_total + per_page - 1) // per_page, 1)
+
+    cases = {
+        'library_first_page': f'/api/library?page=1&per_page={per_page}',
+        'library_middle_page': f'/api/library?page={max(last_page // 2, 1)}&per_page={per_page}',
+        'library_last_page': f'/api/library?page={last_page}&per_page={per_page}',
+        'library_search_text': f'/api/library?search=velvet+night&per_page={per_page}',
+        'library_search_text_deep': f'/api/library?search=velvet&page={search_last_page}&per_page={per_page}',
+        'library_search_field': f'/api/library?search=year:1999&per_page={per_page}',
+        'library_stats': '/api/library/stats',
+        'library_recent': '/api/library/recent',
+        'wishlist_first_page': '/api/wishlist?limit=100',
+        'wishlist_filtered': '/api/wishlist?limit=100&release=released&status=pending',
+        'wishlist_search': '/api/wishlist?limit=100&q=velvet',
+    }
+    if cursor:
+        cases['wishlist_deep_cursor'] = f'/api/wishlist?limit=100&cursor={cursor}'
+
+    results = {name: time_route(client, url, repeat) for name, url in cases.items()}
+    # Stats are cached until the library changes; also measure the recompute
+    results['library_stats_uncached'] = time_route(
+        client, '/api/library/stats', repeat, before=app.library_stats.invalidate
+    )
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,50000,250000', help='comma separated album counts')
+    parser.add_argument('--wishlist', type=int, default=5000, help='wishlist entries')
+    parser.add_argument('--repeat', type=int, default=10, help='requests per case')
+    parser.add_argument('--per-page', type=int, default=50)
+    parser.add_argument('--data-dir', default=os.path.join(ROOT, 'benchmarks', '.data'),
+                        help='where generated databases are kept')
+    parser.add_argument('--output', help='JSON results file (default: benchmarks/results/<timestamp>.json)')
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    output = args.output or os.path.join(
+        ROOT, 'benchmarks', 'results', f"library-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+
+    client = app.app.test_client()
+    report = {
+        'benchmark': 'library',
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'repeat': args.repeat,
+        'wishlist_entries': args.wishlist,
+        'sizes': {}
+    }
+
+    for albums in [int(size) for size in args.sizes.split(',')]:
+        print(f"== {albums} albums")
+        setup = prepare(args.data_dir, albums, args.wishlist)
+        if setup['library_generate_s'] is not None:
+            print(f"   generated library in {setup['library_generate_s']:.1f}s")
+        print(f"   search index synced in {setup['search_index_sync_s']:.1f}s")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = run_cases(client, albums, args.repeat, args.per_page)
+        for name, result in results.items():
+            flag = '' if result['status'] == 200 else f"  (HTTP {result['status']})"
+            print(f"   {name:28s} median {result['median_ms']:9.2f} ms  p95 {result['p95_ms']:9.2f} ms{flag}")
+        report['sizes'][str(albums)] = {'setup': setup, 'routes': results}
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
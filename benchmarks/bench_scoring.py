@@ -0,0 +1,287 @@
+"""Benchmark the slskd candidate scoring against synthetic search responses.
+
+Generates slskd-style user responses, scores every response with both the
+original multi-pass scorer (kept below as the reference) and app.score_album,
+checks that the scores agree and reports the time each one took.
+
+    python benchmarks/bench_scoring.py --responses 500 --files 200
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+ARTIST = 'The Example Artist'
+TITLE = 'Synthetic Album Title'
+EXTENSIONS = ['.mp3', '.mp3', '.mp3', '.m4a', '.ogg', '.wav', '.flac', '.jpg', '.txt', '.cue']
+QUALITY_TAGS = ['', '', '', ' [320]', ' (V0)', ' VBR', ' 128kbps']
+NOISE_WORDS = ['Live', 'Deluxe', 'Remastered', 'Bootleg', 'Various', 'Mix', 'Demo', 'Session']
+
+
+def make_response(rng, user_idx, files_per_response):
+    """One slskd user response: a few folders holding tracks and extras."""
+    files = []
+    folder_count = rng.randint(1, 4)
+    for folder_idx in range(folder_count):
+        parts = ['@@music']
+        if rng.random() < 0.7:
+            parts.append(ARTIST if rng.random() < 0.6 else rng.choice(NOISE_WORDS))
+        album_name = TITLE if rng.random() < 0.5 else ' '.join(rng.sample(NOISE_WORDS, 2))
+        parts.append(f'{album_name}{rng.choice(QUALITY_TAGS)}')
+        separator = '\\' if rng.random() < 0.8 else '/'
+        folder = separator.join(parts)
+
+        for track in range(files_per_response // folder_count):
+            ext = rng.choice(EXTENSIONS)
+            name = f'{track + 1:02d} - {rng.choice(NOISE_WORDS)} {track}{ext}'
+            if rng.random() < 0.1:
+                name = name.replace(ext, f' 320k{ext}')
+            size = int(rng.lognormvariate(15.8, 0.8))  # Mostly 2-30MB, with outliers
+            files.append({'filename': f'{folder}{separator}{name}', 'size': size})
+    return {'username': f'user{user_idx}', 'files': files}
+
+
+def matching_files(response, matcher):
+    """The per-file filter build_candidates applies before scoring."""
+    matches = []
+    for file_info in response['files']:
+        path = file_info.get('filename', '')
+        if matcher.is_audio(path):
+            artist_match, title_match = matcher.match(path)
+            if artist_match or title_match:
+                matches.append({
+                    'file': file_info,
+                    'filename': path.lower(),
+                    'size': file_info.get('size', 0),
+                    'artist_match': artist_match,
+                    'title_match': title_match
+                })
+    return matches
+
+
+def legacy_calculate_album_score(matching_files, artist, title, expected_track_count=None):
+    """calculate_album_score as it was before the single-pass engine, kept
+    verbatim as the reference the new scores must match."""
+    if not matching_files:
+        return 0
+    
+    score = 0
+    num_tracks = len(matching_files)
+    
+    # Track count matching is now the most important factor
+    if expected_track_count and expected_track_count > 0:
+        track_diff = abs(num_tracks - expected_track_count)
+        if track_diff == 0:
+            score += 50  # Perfect match
+            print(f"      PERFECT track count match: {num_tracks}")
+        elif track_diff <= 1:
+            score += 35  # Very close match (within 1 track)
+            print(f"      Excellent track count match: {num_tracks} (±{track_diff})")
+        elif track_diff <= 2:
+            score += 25  # Close match (within 2 tracks)
+            print(f"      Good track count match: {num_tracks} (±{track_diff})")
+        elif track_diff <= 5:
+            score += 10  # Reasonable match
+            print(f"      Fair track count match: {num_tracks} (±{track_diff})")
+        else:
+            score -= 10  # Poor match
+            print(f"      Poor track count match: {num_tracks} (±{track_diff})")
+    else:
+        # If we don't know expected count, use old logic but with less weight
+        score += min(num_tracks * 1, 20)  # Reduced from 2 to 1, max 20 instead of 30
+        print(f"      No expected track count, using count-based scoring: {num_tracks} tracks")
+    
+    # Bonus for both artist and title matches
+    both_matches = sum(1 for f in matching_files if f['artist_match'] and f['title_match'])
+    artist_only = sum(1 for f in matching_files if f['artist_match'] and not f['title_match'])
+    title_only = sum(1 for f in matching_files if not f['artist_match'] and f['title_match'])
+    
+    score += both_matches * 5   # Best: both artist and title
+    score += artist_only * 3    # Good: artist match
+    score += title_only * 2     # OK: title match
+    
+    print(f"      Match quality: {both_matches} both, {artist_only} artist-only, {title_only} title-only")
+    
+    # File format and quality bonuses (MP3 320 preferred)
+    mp3_files = sum(1 for f in matching_files if '.mp3' in f['filename'])
+    m4a_files = sum(1 for f in matching_files if '.m4a' in f['filename'])
+    ogg_files = sum(1 for f in matching_files if '.ogg' in f['filename'])
+    wav_files = sum(1 for f in matching_files if '.wav' in f['filename'])
+    
+    # Check for MP3 320kbps indicators
+    mp3_320_files = 0
+    mp3_vbr_files = 0
+    mp3_low_quality = 0
+    
+    for f in matching_files:
+        filename = f['filename']
+        size = f['size']
+        
+        if '.mp3' in filename:
+            # Estimate bitrate from file size (rough calculation)
+            # Assume 3-5 minute average track length
+            estimated_bitrate = (size * 8) / (4 * 60)  # bits per second for 4-minute track
+            estimated_kbps = estimated_bitrate / 1000
+            
+            # Check filename for quality indicators
+            if any(indicator in filename for indicator in ['320', '320k', '320kbps']):
+                mp3_320_files += 1
+            elif any(indicator in filename for indicator in ['vbr', 'v0', 'v2']):
+                mp3_vbr_files += 1
+            elif estimated_kbps >= 280:  # Likely 320kbps based on size
+                mp3_320_files += 1
+            elif estimated_kbps >= 200:  # Likely VBR or 256kbps
+                mp3_vbr_files += 1
+            elif estimated_kbps < 150:  # Likely low quality
+                mp3_low_quality += 1
+    
+    # Scoring based on format and quality
+    if mp3_320_files > num_tracks * 0.8:  # Mostly MP3 320
+        score += 20
+        print(f"      Mostly MP3 320kbps: +20")
+    elif mp3_320_files > 0:
+        score += 15
+        print(f"      Some MP3 320kbps: +15")
+    elif mp3_vbr_files > num_tracks * 0.6:  # Mostly MP3 VBR
+        score += 12
+        print(f"      Mostly MP3 VBR3 VBR: +12")
+    elif mp3_files > num_tracks * 0.8:  # Mostly MP3 (unknown quality)
+        score += 8
+        print(f"      Mostly MP3: +8")
+    elif m4a_files > 0:
+        score += 6
+        print(f"      M4A files: +6")
+    elif ogg_files > 0:
+        score += 4
+        print(f"      OGG files: +4")
+    elif wav_files > 0:
+        score += 3  # WAV is lossless but huge
+        print(f"      WAV files: +3")
+    
+    # Penalty for low quality MP3s
+    if mp3_low_quality > 0:
+        penalty = mp3_low_quality * 5
+        score -= penalty
+        print(f"      Low quality MP3 penalty: -{penalty}")
+    
+    # Bonus for organized structure (files in folders)
+    folder_files = sum(1 for f in matching_files if '/' in f['file'].get('filename', ''))
+    if folder_files > num_tracks * 0.7:  # Most files are in folders
+        score += 10
+        print(f"      Well organized (in folders): +10")
+    elif folder_files > 0:
+        score += 5
+        print(f"      Partially organized: +5")
+    
+    # Bonus for reasonable file sizes for MP3 320
+    # MP3 320kbps: roughly 2.4MB per minute, so 8-12MB for typical 3-5 minute track
+    good_size_files = 0
+    for f in matching_files:
+        size_mb = f['size'] / (1024 * 1024)
+        if '.mp3' in f['filename']:
+            if 6 <= size_mb <= 15:  # Good size for MP3 320
+                good_size_files += 1
+        elif size_mb > 1:  # At least 1MB for other formats
+            good_size_files += 1
+    
+    if good_size_files == num_tracks:
+        score += 8
+        print(f"      All files good size for quality: +8")
+    elif good_size_files > num_tracks * 0.8:
+        score += 5
+        print(f"      Most files good size: +5")
+    
+    # Check for very large files (might be videos or uncompressed)
+    huge_files = sum(1 for f in matching_files if f['size'] > 50000000)  # > 50MB
+    if huge_files > 0:
+        score -= huge_files * 3
+        print(f"      {huge_files} suspiciously large files: -{huge_files * 3}")
+    
+    # Check for very small files (might be low quality or corrupted)
+    tiny_files = sum(1 for f in matching_files if f['size'] < 2000000)  # < 2MB
+    if tiny_files > 0:
+        score -= tiny_files * 2
+        print(f"      {tiny_files} suspiciously small files: -{tiny_files * 2}")
+    
+    # Penalty for very few tracks (likely not a full album)
+    if num_tracks < 3:
+        score -= 15
+        print(f"      Too few tracks penalty: -15")
+    elif num_tracks < 5:
+        score -= 5
+        print(f"      Few tracks penalty: -5")
+    
+    # Bonus for typical album track counts
+    if 8 <= num_tracks <= 20:
+        score += 5
+        print(f"      Typical album length: +5")
+    
+    final_score = max(score, 0)  # Don't return negative scores
+    print(f"      Final score: {final_score}")
+    return final_score
+
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--responses', type=int, default=200, help='user responses per search')
+    parser.add_argument('--files', type=int, default=100, help='files per response')
+    parser.add_argument('--expected-tracks', type=int, default=12, help='expected track count (0 for unknown)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement, best is reported')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    responses = [make_response(rng, i, args.files) for i in range(args.responses)]
+    matcher = app.AlbumMatcher(ARTIST, TITLE)
+    file_sets = [matching_files(response, matcher) for response in responses]
+    total_files = sum(len(r['files']) for r in responses)
+    print(f"{len(responses)} responses, {total_files} files, {sum(map(len, file_sets))} matching")
+
+    def run_legacy():
+        # The original scorer prints on every branch; that cost is part of what it did
+        with contextlib.redirect_stdout(io.StringIO()):
+            return [legacy_calculate_album_score(files, ARTIST, TITLE, args.expected_tracks) if files else 0
+                    for files in file_sets]
+
+    def run_engine():
+        return [app.score_album(files, args.expected_tracks)['score'] for files in file_sets]
+
+    def run_build_candidates():
+        return app.build_candidates(responses, app.AlbumMatcher(ARTIST, TITLE), args.expected_tracks, 'benchmark')
+
+    legacy_time, legacy_scores = timed(run_legacy, args.repeat)
+    engine_time, engine_scores = timed(run_engine, args.repeat)
+    build_time, candidates = timed(run_build_candidates, args.repeat)
+
+    mismatches = [i for i, (a, b) in enumerate(zip(legacy_scores, engine_scores)) if a != b]
+    print(f"legacy scorer:    {legacy_time * 1000:8.1f} ms")
+    print(f"score_album:      {engine_time * 1000:8.1f} ms ({legacy_time / engine_time:.1f}x)")
+    print(f"build_candidates: {build_time * 1000:8.1f} ms ({len(candidates)} candidates)")
+    if mismatches:
+        print(f"SCORE MISMATCH in {len(mismatches)} responses, first: #{mismatches[0]} "
+              f"legacy={legacy_scores[mismatches[0]]} engine={engine_scores[mismatches[0]]}")
+        return 1
+    print(f"scores match for all {len(file_sets)} responses")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())